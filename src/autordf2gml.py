@@ -1,253 +1,48 @@
 import rdflib
-from rdflib import Literal, URIRef
+import json
+from rdflib import Literal
 import pandas as pd
 import numpy as np
-import configparser
-import re
 from sklearn.preprocessing import LabelEncoder
 from sklearn.preprocessing import MinMaxScaler
 import time
-import torch
-from transformers import AutoTokenizer, AutoModel
-from tqdm import tqdm
 import os
 import argparse
 
+from triple_index import load_triple_index
+from graph_tables import NodeIndex, save_table, split_categorical, update_manifest
+from conversion_plan import ConversionPlan, ConfigError, compile_plan
+from text_embedder import get_embedder
+
 # start_time = time.time()
 # print(f"--- {start_time=} ---")
 
 def _get_parser():
   parser = argparse.ArgumentParser()
   parser.add_argument("--config_path", type=str, default='use-case-aifb/config-aifb.ini')
+  #fits the feature schema of [FeatureSelection] schema_path on these RDF files and exits
+  parser.add_argument("--fit_schema", type=str, nargs='+', default=None)
   # parser.add_argument("--config", type=str, default='config.ini')
   return parser
 
 def folder_check(mpath):
-  if os.path.isdir(mpath): 
+  if os.path.isdir(mpath):
     print (f'## Path exists: {mpath}')
-  else: 
+  else:
     os.makedirs(mpath, exist_ok=True)
     print (f'## Path {mpath} created!')
 
-args = _get_parser().parse_args()
-
-#Define the path to the config file
-config = configparser.ConfigParser()
-print(f"## AutoRDF2GML (content-based): START! ##")
-start_time = time.time()
-print(f"## {start_time=}")
-print(f"## Loading the config file: {args.config_path}")
-config.read(args.config_path)
-# config.read('use-case-aifb/config-cb.ini')
-# config.read('/example/path/config-cb.ini')
 
 ##########################################################################################
 #
-# START AutoRDF2GML Content-based (CB) Node Features Version
+# START AUTOMATIC FEATURE SELECTION AND TRANSFORMATION HELPERS
 #
 ##########################################################################################
 
-#Parse the config
-file_path = config.get('InputPath', 'input_path')
-save_path_numeric_graph = config.get('SavePath', 'save_path_numeric_graph')
-save_path_mapping = config.get('SavePath', 'save_path_mapping')
-nld_class = config.get('NLD', 'nld_class')
-pivoted_df_nld = f"pivoted_df_{nld_class}"
-embedding_model = config.get('EMBEDDING', 'embedding_model')
-
-folder_check(save_path_numeric_graph)
-folder_check(save_path_mapping)
-
-print (f'## Configs: input:{file_path} / {nld_class=} / {embedding_model=} / output:{save_path_mapping=} {save_path_numeric_graph}')
-
-#get the defined names for the classes and edges from the config file
-class_names = config.get('Nodes', 'classes').split(', ')
-edge_names_simple = config.get('SimpleEdges', 'edge_names').split(', ')
-edge_names_n_aray = config.get('N-ArayEdges', 'edge_names').split(', ')
-edge_names_n_hop = config.get('N-HopEdges', 'edge_names').split(', ')
-
-graph = rdflib.Graph()
-print(f"## Loading the RDF dump from: {file_path=}...")
-graph.parse(file_path, format="nt")
-print(f"## RDF dump file loaded. The RDF graph contains {len(graph)} triples.")
-
-print(f"## Transformation started! Querying the graph...")
-print(f"## Checking RDF graph triples. First triple (if any):")
-
-for s, p, o in graph.triples((None, None, None)):
-    print(f"  {s} {p} {o}")
-    break # Just print the first one to confirm it's loaded
-if not len(graph):
-    print("  WARNING: RDF graph appears empty! Check file_path and format.")
-
-#create dictionaries for classes
-class_dict = {class_name: [rdflib.URIRef(uri.strip()) for uri in config.get('Nodes', class_name).split(',')] for class_name in class_names}
-
-#create dictionaries for simple edges
-simple_edge_dict = {}
-for edge_name in edge_names_simple:
-    start_node_name = config.get('SimpleEdges', f'{edge_name}_start_node')
-    start_node = class_dict[start_node_name]
-    properties = config.get('SimpleEdges', f'{edge_name}_properties').split(', ')
-    end_node_name = config.get('SimpleEdges', f'{edge_name}_end_node')
-    end_node = class_dict[end_node_name]
-    simple_edge_dict[edge_name] = [start_node, properties, end_node]
-
-#create dictonaries for n-aray edges
-n_aray_edge_dict = {}
-for edge_name in edge_names_n_aray:
-    start_node_name = config.get('N-ArayEdges', f'{edge_name}_start_node')
-    start_node = class_dict[start_node_name]
-    properties = config.get('N-ArayEdges', f'{edge_name}_properties').split(', ')
-    end_node_name = config.get('N-ArayEdges', f'{edge_name}_end_node')
-    end_node = class_dict[end_node_name]
-    n_aray_edge_dict[edge_name] = [start_node, properties, end_node]
-
-#create dictonaryies for n-aray feature paths and feature values
-n_aray_feature_path_dict = {}
-n_aray_feature_value_dict = {}
-for edge_name in edge_names_n_aray:
-    n_aray_feature_path_dict[edge_name + '_feature_path'] = config.get('N-ArayFeaturePath', edge_name + '_feature_path').split(', ')
-    n_aray_feature_value_dict[edge_name + '_feature_value'] = config.get('N-ArayFeatureValue', edge_name + '_feature_value')
-
-#create dictonaries for n-hop edges
-n_hop_edge_dict = {}
-for edge_name in edge_names_n_hop:
-    start_node = class_dict[config.get('N-HopEdges', edge_name + '_start_node')]
-    end_node = class_dict[config.get('N-HopEdges', edge_name + '_end_node')]
-    n_hop_edge = [start_node]
-    hop_index = 1
-    while True:
-        hop_key = edge_name + '_hop' + str(hop_index) + '_properties'
-        if config.has_option('N-HopEdges', hop_key):
-            properties = config.get('N-HopEdges', hop_key).split(', ')
-            n_hop_edge.append(properties) 
-            hop_index += 1
-        else:
-            break
-    n_hop_edge.append(end_node) 
-    n_hop_edge_dict[edge_name] = n_hop_edge
-
-
-
-#creates lists for the entity uris
-uri_lists = {}
-for class_name in class_names:
-    uri_list_name = f"uri_list_{class_name}"
-    globals()[uri_list_name] = []
-    uri_lists[uri_list_name] = globals()[uri_list_name]
-
-nodes_data_df = {}
-for class_name in class_names:
-    nodes_data_df[f'df_{class_name}'] = pd.DataFrame(columns=["subject", "predicate", "object"])
-
-    
-nodes_data_pivoted_df = {}
-for class_name in class_names:
-    nodes_data_pivoted_df[f'pivoted_df_{class_name}'] = pd.DataFrame()
-    
-
-for uri_list, node_class in zip(uri_lists, class_dict.values()):
-    entity_list = uri_lists[uri_list]
-
-    query = """
-        SELECT DISTINCT ?entity
-        WHERE {
-            ?entity rdf:type ?class .
-        }
-    """
-
-    for class_uri in node_class:
-        query_with_class = query.replace("?class", f"<{class_uri}>")
-        for row in graph.query(query_with_class):
-            entity_uri = row[0]
-            if entity_uri not in entity_list:
-                entity_list.append(entity_uri)
-
-
-
-for node_class, uri_list, node_data_df in zip(class_dict.values(), uri_lists, nodes_data_df.items()):
-    key, value = node_data_df
-    entity_list = uri_lists[uri_list]
-
-    query = """
-        SELECT DISTINCT ?a ?b ?c 
-        WHERE {
-            ?a rdf:type ?class .
-            ?a ?b ?c .
-        }
-      """
-    all_rows = []
-    for class_uri in node_class:
-        query_with_uri = query.replace("?class", f"<{class_uri}>")
-        for row in graph.query(query_with_uri):
-            new_row = {
-                "subject": row[0],
-                "predicate": row[1],
-                "object": row[2]
-            }
-            all_rows.append(new_row)
-    
-    new_rows_df = pd.DataFrame(all_rows, columns=["subject", "predicate", "object"])
-    value = pd.concat([value, new_rows_df], ignore_index=True)
-    nodes_data_df[key] = value
-
-
-#deletes object properties with URIRef
-for key, value in nodes_data_df.items():
-    indices_to_drop = value[value['object'].apply(lambda x: isinstance(x, rdflib.URIRef))].index
-    
-    value.drop(indices_to_drop, inplace=True)
-
-
-
 #pivotes the RDF triples to an dataframe in matrix form
 def join_with_comma(x):
     return ', '.join(map(str, x))
 
-for data_df, data_pivoted_df in zip(nodes_data_df.items(), nodes_data_pivoted_df.items()):
-    key, value = data_df
-    key_pivot, value_pivot = data_pivoted_df
-    
-    grouped_df = nodes_data_df[key].groupby(['subject', 'predicate'])['object'].apply(join_with_comma).reset_index()
-
-    pivoted_df_temp = grouped_df.pivot(index='subject', columns='predicate', values='object').reset_index()
-
-    nodes_data_pivoted_df[key_pivot] = pd.concat([value_pivot, pivoted_df_temp], axis=1)
-
-
-
-##########################################################################################
-#
-# START AUTOMATIC FEATURE SELECTION AND TRANSFORMATION
-#
-##########################################################################################
-
-print(f"## Automatic feature selection...")
-
-#Find NLD columns
-print (f'## NLD column: {pivoted_df_nld}')
-
-text_columns = []
-# for col in nodes_data_pivoted_df["pivoted_df_work"].columns:
-#     sample_values = nodes_data_pivoted_df["pivoted_df_work"][col].head(1000).dropna()
-for col in nodes_data_pivoted_df[pivoted_df_nld].columns:
-    sample_values = nodes_data_pivoted_df[pivoted_df_nld][col].head(1000).dropna()
-    unique_strings = sample_values.nunique()
-    
-    avg_spaces = sample_values.apply(lambda x: str(x).count(' ')).mean()
-
-    if unique_strings > 3 and avg_spaces > 3:
-        text_columns.append(col)
-
-
-cols_to_keep = []
-cols_to_keep.append('subject')
-cols_to_keep.append('string-values')
-
-for col in text_columns:
-    cols_to_keep.append(col)
-
 
 #merge NLD columns
 def merge_columns(df, text_columns):
@@ -263,85 +58,157 @@ def merge_columns(df, text_columns):
 
 
 #embed nld strings with scibert
-def embed_strings(dataframe, column):
-    # tokenizer = AutoTokenizer.from_pretrained('allenai/scibert_scivocab_uncased')
-    # model = AutoModel.from_pretrained('allenai/scibert_scivocab_uncased')
-    tokenizer = AutoTokenizer.from_pretrained(embedding_model)
-    model = AutoModel.from_pretrained(embedding_model)
-    
+def embed_strings(dataframe, column, embedder, output_size=128):
     def random_embedding(output_size=128):
         return np.random.randn(output_size)
 
-    def embed_abstract(abstract, max_length=512, output_size=128):
-        if pd.isna(abstract) or abstract == "":
-            return random_embedding(output_size)
-
-        tokens = tokenizer(abstract, max_length=max_length, truncation=True, padding='max_length', return_tensors='pt')
-        input_ids = tokens['input_ids']
-        attention_mask = tokens['attention_mask']
-
-        with torch.no_grad():
-            outputs = model(input_ids, attention_mask=attention_mask)
-        embeddings = outputs.last_hidden_state
-
-        reduced_embeddings = torch.mean(embeddings, dim=1)[:, :output_size]
-        return reduced_embeddings.numpy().squeeze()
-    
     try:
-        tqdm.pandas(desc="Embedding Progress")
-        dataframe['embeddings'] = dataframe[column].progress_apply(embed_abstract)
+        values = dataframe[column]
     except KeyError:
         return dataframe
 
+    #empty strings get a random embedding, the rest is embedded in batches
+    is_empty = values.isna() | (values == "")
+    texts = values[~is_empty].tolist()
+    text_embeddings = iter(embedder.embed(texts, output_size=output_size))
+
+    dataframe['embeddings'] = [random_embedding(output_size) if empty else next(text_embeddings) for empty in is_empty]
+
     return dataframe
 
 
 
-def convert_to_string(df):
-    return df.applymap(lambda x: str(x) if isinstance(x, (Literal, URIRef)) else x)
+#column profile shared by the feature selection stages
+def profile_columns(df, sample_size=1000):
+    """Profile every column once: dtype class, cardinality, null ratio and whether a
+    bounded sample of its values looks like URIs or '%Y-%m-%d' dates."""
+    total_rows = len(df)
+    rows = []
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_bool_dtype(values.dtype):
+            dtype_class = 'bool'
+        elif pd.api.types.is_numeric_dtype(values.dtype):
+            dtype_class = 'numeric'
+        elif pd.api.types.is_datetime64_any_dtype(values.dtype):
+            dtype_class = 'datetime'
+        else:
+            dtype_class = 'object'
+
+        is_null = values.isna()
+        n_non_null = total_rows - int(is_null.sum())
+        uri_like = date_like = False
+
+        if dtype_class == 'object' and total_rows:
+            sample = values.head(sample_size)
+            sample_is_null = is_null.head(sample_size)
+            try:
+                lengths = sample.str.len()
+            except AttributeError:
+                lengths = pd.Series(np.nan, index=sample.index)
+            strings = sample[lengths.notna()]
+            strings = pd.Series(strings.to_numpy().astype(str), index=strings.index, dtype=object)
+
+            uri_like = bool(strings.str.startswith(('http://', 'https://')).any())
+
+            #missing and empty values count as dates, like pd.to_datetime on single values did
+            parsed = pd.to_datetime(strings, format='%Y-%m-%d', errors='coerce')
+            date_hits = int(sample_is_null.sum()) + int((lengths == 0).sum()) + int(parsed.notna().sum())
+            date_like = date_hits / len(sample) > 0.5
+
+        rows.append({
+            'column': col,
+            'dtype_class': dtype_class,
+            'n_unique': int(values.nunique()),
+            'n_non_null': n_non_null,
+            'null_ratio': 1 - n_non_null / total_rows if total_rows else 1.0,
+            'uri_like': uri_like,
+            'date_like': date_like,
+        })
+
+    columns = ['dtype_class', 'n_unique', 'n_non_null', 'null_ratio', 'uri_like', 'date_like']
+    return pd.DataFrame(rows, columns=['column'] + columns).set_index('column')
+
+
+def _profile_flag(profile, col, field):
+    #columns created after profiling (one-hot dummies) are never URIs or dates
+    return col in profile.index and bool(profile.at[col, field])
 
 
 #automatic features selection (preprocessing)
-def preprocess_dataframe(df, cols_to_keep):
-    total_rows = len(df)
+def preprocess_dataframe(df, cols_to_keep, profile=None):
+    if profile is None:
+        profile = profile_columns(df)
+
     for col in df.columns:
         if col not in cols_to_keep:
-            missing_values = df[col].isnull().sum()
-            unique_values = len(df[col].dropna().unique())
-            unique_percent = unique_values / len(df[col].dropna())
-            missing_percent = missing_values / total_rows
-            identical_precentage = unique_values 
+            unique_values = profile.at[col, 'n_unique']
+            non_null = profile.at[col, 'n_non_null']
+            unique_percent = unique_values / non_null if non_null else 0
+            missing_percent = profile.at[col, 'null_ratio']
             if unique_percent > 0.90 or missing_percent > 0.25 or unique_values == 1:
                 del df[col]
     return df
 
 #remove highly correlated columns
-def remove_highly_correlated_columns(df, cols_to_keep):
+def _blocked_correlated_pairs(values, threshold, block_size):
+    #(i, j) index pairs with j < i and |pearson(values[:, i], values[:, j])| > threshold.
+    #only a block_size x c slice of the correlation matrix exists at any time; missing
+    #values are set to the column mean, i.e. they do not add to the correlation
+    std = np.nanstd(values, axis=0, ddof=1)
+    valid = np.isfinite(std) & (std > 0)
+    z = (values - np.nanmean(values, axis=0)) / np.where(valid, std, 1.0)
+    z = np.where(np.isnan(z), 0.0, z)
+    z[:, ~valid] = 0.0
+    n = max(len(values) - 1, 1)
+
+    pairs = []
+    for start in range(0, values.shape[1], block_size):
+        stop = min(start + block_size, values.shape[1])
+        corr_block = z[:, start:stop].T @ z[:, :stop] / n
+        rows, cols = np.nonzero(np.abs(np.tril(corr_block, start - 1)) > threshold)
+        rows = rows + start
+        keep = valid[rows] & valid[cols]
+        pairs.append(np.stack([rows[keep], cols[keep]], axis=1))
+    return np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=int)
+
+
+def remove_highly_correlated_columns(df, cols_to_keep, threshold=0.95, block_size=None):
     df_corr = df.copy()
-    
+
     for col in df_corr.columns:
-        if col not in cols_to_keep: 
+        if col not in cols_to_keep:
             df_corr[col] = df_corr[col].astype('category').cat.codes
 
-    corr_matrix = df_corr.corr(method='pearson')
+    #the kept columns (subject, nld strings) are not numeric and are skipped
+    numeric_df = df_corr.select_dtypes(include=[np.number, 'bool'])
+    columns = numeric_df.columns
+    if len(columns) < 2:
+        return df
 
-    columns_to_drop = []
+    if block_size is None:
+        corr_matrix = numeric_df.corr(method='pearson').to_numpy()
+        pairs = np.argwhere(np.abs(np.tril(corr_matrix, -1)) > threshold)
+    else:
+        pairs = _blocked_correlated_pairs(numeric_df.to_numpy(dtype=np.float64), threshold, block_size)
 
-    for i in range(len(corr_matrix.columns)):
-        for j in range(i):
-            if abs(corr_matrix.iloc[i, j]) > 0.95:
-                col_to_drop = corr_matrix.columns[i] if df_corr[corr_matrix.columns[i]].count() < df_corr[corr_matrix.columns[j]].count() else corr_matrix.columns[j]
-                if col_to_drop not in cols_to_keep: 
-                    columns_to_drop.append(col_to_drop)
+    #of each correlated pair the column with fewer values goes, on ties the earlier one
+    counts = numeric_df.count().to_numpy()
+    i, j = pairs[:, 0], pairs[:, 1]
+    drop_index = np.where(counts[i] < counts[j], i, j)
+    columns_to_drop = [col for col in columns[np.unique(drop_index)] if col not in cols_to_keep]
 
     df.drop(columns_to_drop, axis=1, inplace=True)
-    
+
     return df
 
 
-def one_hot_encode_categorical_columns(df):
-    cat_cols = [col for col in df.columns if df[col].dtype == 'object' and 2 <= df[col].nunique() <= 10]
-    
+def one_hot_encode_categorical_columns(df, cols_to_keep, profile=None):
+    if profile is None:
+        profile = profile_columns(df)
+
+    cat_cols = [col for col in df.columns if profile.at[col, 'dtype_class'] == 'object' and 2 <= profile.at[col, 'n_unique'] <= 10]
+
     for col in cat_cols:
         if col not in cols_to_keep:
             # One-hot encode with NaN as a separate category
@@ -350,54 +217,53 @@ def one_hot_encode_categorical_columns(df):
 
             # Drop the original column after one-hot encoding
             df.drop(columns=[col], inplace=True)
-            
+
     return df
 
 
-def label_encode_categorical_columns(df):
+def label_encode_categorical_columns(df, cols_to_keep, profile=None):
+    if profile is None:
+        profile = profile_columns(df)
+
     le = LabelEncoder()
 
-    cat_cols = [col for col in df.columns if df[col].dtype == 'object' and 10 < df[col].nunique() <= 100]
-    
+    cat_cols = [col for col in df.columns if col in profile.index and profile.at[col, 'dtype_class'] == 'object' and 10 < profile.at[col, 'n_unique'] <= 100]
+
     for col in cat_cols:
         if col not in cols_to_keep:
             mask = df[col].notna() & (df[col] != '')
-            
+
             # Convert only non-NaN and non-empty values to string and then encode them
             df.loc[mask, col] = le.fit_transform(df.loc[mask, col].astype(str))
-            
+
             # Replace NaN and empty values with median of the column
             median_value = df[col].astype(np.float64).median()
             df[col].fillna(median_value, inplace=True)
             df.loc[df[col] == '', col] = median_value
 
+            # The encoded values are plain numbers now
+            profile.loc[col, ['uri_like', 'date_like']] = False
+
     return df
 
 
-def convert_datetime_to_unix(df):
-    def majority_is_timestamp(col):
-        count = 0
-        for value in col:
-            try:
-                pd.to_datetime(value, format='%Y-%m-%d')
-                count += 1
-            except:
-                pass
-        return count / len(col) > 0.5
+def convert_datetime_to_unix(df, profile=None):
+    if profile is None:
+        profile = profile_columns(df)
 
     for col in df.columns:
-        if df[col].dtype == 'object' and majority_is_timestamp(df[col]):
+        if df[col].dtype == 'object' and _profile_flag(profile, col, 'date_like'):
 
             try:
                 # Convert the column to datetime format
-                df[col] = pd.to_datetime(df[col], errors='coerce', format='%Y-%m-%d')
-                
+                dates = pd.to_datetime(df[col], errors='coerce', format='%Y-%m-%d')
+
                 # Convert datetime values to timestamp; leave NaN values as they are
-                df[col] = df[col].apply(lambda x: x.timestamp() if not pd.isna(x) else np.nan)
-                
+                df[col] = (dates - pd.Timestamp(0)).dt.total_seconds()
+
                 # Compute mean timestamp and replace NaN values with it
                 mean_timestamp = df[col].mean()
-                df[col].fillna(mean_timestamp, inplace=True)
+                df[col] = df[col].fillna(mean_timestamp)
             except:
                 pass
 
@@ -405,10 +271,13 @@ def convert_datetime_to_unix(df):
 
 
 
-def delete_uri_columns(df: pd.DataFrame) -> pd.DataFrame:
+def delete_uri_columns(df: pd.DataFrame, cols_to_keep, profile=None) -> pd.DataFrame:
+    if profile is None:
+        profile = profile_columns(df)
+
     for column in df.columns:
         if column not in cols_to_keep:
-            if df[column].apply(lambda x: isinstance(x, str) and (x.startswith('https://') or x.startswith('http://'))).any():
+            if _profile_flag(profile, column, 'uri_like'):
                 df = df.drop(column, axis=1)
     return df
 
@@ -432,356 +301,521 @@ def normalize_large_values(df):
     return df
 
 
-#Apply the automatic feature selection and transformation
-for key, value in nodes_data_pivoted_df.items(): 
-    
-    value = merge_columns(value, text_columns)
-    value = preprocess_dataframe(value, cols_to_keep)
-    value = one_hot_encode_categorical_columns(value)
-    value = label_encode_categorical_columns(value)
-    value = delete_uri_columns(value)    
-    value = remove_highly_correlated_columns(value, cols_to_keep)
-    value = convert_datetime_to_unix(value)
-    value = normalize_large_values(value)
-    value = embed_strings(value, 'string-values')
-
-    # Update the value in the original dictionary
-    nodes_data_pivoted_df[key] = value
-    
-
-#split the nld embeddings column into sepeate columns
-for key, value in nodes_data_pivoted_df.items():
-    if 'embeddings' in value.columns:
-
-        embeddings = pd.DataFrame(value['embeddings'].to_list(), columns=[f'embedding_{i}' for i in range(128)])
-
-        value.drop('embeddings', axis=1, inplace=True)
-
-        value = pd.concat([value.reset_index(drop=True), embeddings.reset_index(drop=True)], axis=1)
-
-        nodes_data_pivoted_df[key] = value
+def n_aray_edge_features(index, edge_list, feature_path, feature_values):
+    """Numeric feature values of n-aray edges, resolved with one join over all edges.
 
+    For an edge (a, b) the values are read from the node c with a feature_path[0] c
+    and c feature_path[1] b, one column per predicate in feature_values. Rows are
+    aligned with edge_list; missing or non-numeric values are NaN.
+    """
+    result = np.full((len(edge_list), len(feature_values)), np.nan, dtype=np.float32)
+    if not edge_list:
+        return result
+
+    edges = pd.DataFrame(edge_list, columns=['a', 'b'])
+    edges['row'] = np.arange(len(edges))
+    paths = index.predicate_frame(feature_path[0], columns=('a', 'c')).merge(index.predicate_frame(feature_path[1], columns=('c', 'b')), on='c')
+    paths = edges.merge(paths, on=['a', 'b'])
+
+    for col, feature_value in enumerate(feature_values):
+        values = index.predicate_frame(feature_value, columns=('c', 'f'))
+        values['f'] = pd.to_numeric(values['f'].map(lambda x: x.toPython() if isinstance(x, Literal) else None), errors='coerce')
+        values = paths.merge(values.dropna(), on='c').drop_duplicates('row')
+        result[values['row'].to_numpy(), col] = values['f'].to_numpy(dtype=np.float32)
+    return result
+
+
+def find_text_columns(df, sample_size=1000):
+    #NLD columns: more than 3 distinct values with more than 3 spaces on average
+    text_columns = []
+    for col in df.columns:
+        sample_values = df[col].head(sample_size).dropna()
+        unique_strings = sample_values.nunique()
 
-#Delte the 'string-values' column
-for key, value in nodes_data_pivoted_df.items():
-    if 'string-values' in value.columns:
-        value.drop('string-values', axis=1, inplace=True)
-        nodes_data_pivoted_df[key] = value
+        avg_spaces = sample_values.apply(lambda x: str(x).count(' ')).mean()
 
+        if unique_strings > 3 and avg_spaces > 3:
+            text_columns.append(col)
+    return text_columns
 
 
 ##########################################################################################
 #
-# END AUTOMATIC FEATURE SELECTION AND TRANSFORMATION
+# START CORPUS-LEVEL FEATURE SCHEMA
 #
 ##########################################################################################
 
+class FeatureSchema:
+    """Feature selection and transformation fitted once on a corpus sample.
+
+    `fit` runs the automatic feature selection over the node tables of several
+    designs and records, per node table, the kept columns, the one-hot categories,
+    the label maps, the date fill values and the min/max scalers. `transform` only
+    applies them, so every design gets the same columns in the same order and no
+    column is profiled again. Saved as JSON.
+    """
+
+    def __init__(self, text_columns, tables):
+        #tables: pivoted_df_<class> -> {'columns', 'text', 'one_hot', 'label', 'dates', 'scale'}
+        self.text_columns = list(text_columns)
+        self.tables = tables
+
+    @classmethod
+    def fit(cls, samples, nld_key, sample_size=1000, correlation_block_size=None):
+        """samples: node table dicts (pivoted_df_<class> -> frame with a 'subject'
+        column) of the designs to fit on, as built by ContentConverter."""
+        keys = list(dict.fromkeys(key for sample in samples for key in sample))
+        #the predicate columns are URIRefs, kept as plain str so the schema matches after a JSON round trip
+        corpus = {key: pd.concat([sample[key] for sample in samples if key in sample], ignore_index=True).rename(columns=str) for key in keys}
+
+        text_columns = find_text_columns(corpus[nld_key], sample_size) if nld_key in corpus else []
+        tables = {key: cls._fit_table(value, text_columns, sample_size, correlation_block_size) for key, value in corpus.items()}
+        return cls(text_columns, tables)
+
+    @classmethod
+    def _fit_table(cls, df, text_columns, sample_size, correlation_block_size):
+        cols_to_keep = ['subject', 'string-values'] + list(text_columns)
+        spec = {'columns': [], 'text': False, 'one_hot': {}, 'label': {}, 'dates': {}, 'scale': {}}
+
+        #the same stages as the per-file selection, each decision is recorded
+        df = merge_columns(df.copy(), text_columns)
+        spec['text'] = 'string-values' in df.columns
+        profile = profile_columns(df, sample_size=sample_size)
+        df = preprocess_dataframe(df, cols_to_keep, profile)
+
+        for col in df.columns:
+            if col not in cols_to_keep and profile.at[col, 'dtype_class'] == 'object' and 2 <= profile.at[col, 'n_unique'] <= 10:
+                spec['one_hot'][col] = [str(category) for category in pd.Categorical(df[col].dropna()).categories]
+            elif col not in cols_to_keep and profile.at[col, 'dtype_class'] == 'object' and 10 < profile.at[col, 'n_unique'] <= 100:
+                values = df[col][df[col].notna() & (df[col] != '')].astype(str)
+                classes = sorted(values.unique())
+                spec['label'][col] = {'classes': classes, 'fill': float(np.median(pd.Index(classes).get_indexer(values))) if len(values) else np.nan}
+                profile.loc[col, ['uri_like', 'date_like']] = False
+        df = cls._encode(df, spec)
+
+        df = delete_uri_columns(df, cols_to_keep, profile)
+        df = remove_highly_correlated_columns(df, cols_to_keep, block_size=correlation_block_size)
+
+        for col in df.columns:
+            if col not in cols_to_keep and df[col].dtype == 'object' and _profile_flag(profile, col, 'date_like'):
+                spec['dates'][col] = float(_unix_seconds(df[col]).mean())
+
+        for col in df.columns:
+            if col in cols_to_keep:
+                continue
+            if col in spec['dates']:
+                values = _unix_seconds(df[col]).fillna(spec['dates'][col])
+            else:
+                try:
+                    values = pd.to_numeric(df[col], errors='raise')
+                except (ValueError, TypeError):
+                    print(f"## Feature schema: column {col} is not numeric, not kept")
+                    continue
+            spec['columns'].append(col)
+            min_val, max_val = values.min(), values.max()
+            if max_val > 3 or min_val < -3:
+                spec['scale'][col] = [float(min_val), float(max_val)]
+        return spec
+
+    @staticmethod
+    def _encode(df, spec):
+        #one-hot and label encoding with the fitted categories, in place of the source columns
+        df = df.copy()
+        for col, label in spec['label'].items():
+            values = df[col] if col in df.columns else pd.Series(np.nan, index=df.index, dtype=object)
+            codes = pd.Index(label['classes']).get_indexer(values.astype(str)).astype(np.float64)
+            missing = (codes < 0) | values.isna().to_numpy() | (values == '').to_numpy()
+            df[col] = np.where(missing, label['fill'], codes)
+
+        dummies = {}
+        for col, categories in spec['one_hot'].items():
+            values = df[col] if col in df.columns else pd.Series(np.nan, index=df.index, dtype=object)
+            codes = pd.Categorical(values, categories=categories).codes
+            for i, category in enumerate(categories):
+                dummies[f'{col}_{category}'] = codes == i
+            dummies[f'{col}_nan'] = values.isna().to_numpy()
+
+        df = df.drop(columns=[col for col in spec['one_hot'] if col in df.columns])
+        return pd.concat([df, pd.DataFrame(dummies, index=df.index)], axis=1)
+
+    def transform(self, nodes_data_pivoted_df, embedder, output_size=128):
+        """Apply the schema to the pivoted node tables of one design. Tables and
+        columns the schema does not know are dropped, missing ones filled in."""
+        result = {}
+        for key, spec in self.tables.items():
+            df = nodes_data_pivoted_df.get(key)
+            if df is None:
+                df = pd.DataFrame(columns=['subject'])
+            df = df.reset_index(drop=True).rename(columns=str)
+            if spec['text']:
+                text_columns = [col for col in self.text_columns if col in df.columns]
+                df['string-values'] = df[text_columns].apply(lambda row: ' '.join(row.dropna().map(str)), axis=1) if text_columns else pd.Series('', index=df.index, dtype=object)
+            encoded = self._encode(df, spec)
+
+            features = {}
+            for col in spec['columns']:
+                values = encoded[col] if col in encoded.columns else pd.Series(np.nan, index=encoded.index)
+                if col in spec['dates']:
+                    values = _unix_seconds(values).fillna(spec['dates'][col])
+                else:
+                    values = pd.to_numeric(values, errors='coerce')
+                if col in spec['scale']:
+                    min_val, max_val = spec['scale'][col]
+                    values = (values - min_val) / ((max_val - min_val) or 1.0)
+                features[col] = values.to_numpy()
+            table = pd.concat([df[['subject']], pd.DataFrame(features, index=df.index, columns=spec['columns'])], axis=1)
+
+            if spec['text']:
+                embedded = embed_strings(df[['string-values']].copy(), 'string-values', embedder, output_size)
+                embeddings = np.array(embedded['embeddings'].to_list(), dtype=np.float64).reshape(len(df), output_size)
+                table = pd.concat([table, pd.DataFrame(embeddings, index=df.index, columns=[f'embedding_{i}' for i in range(output_size)])], axis=1)
+            result[key] = table
+        return result
+
+    def save(self, path):
+        with open(path, 'w') as file:
+            json.dump({'text_columns': self.text_columns, 'tables': self.tables}, file, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            schema = json.load(file)
+        return cls(schema['text_columns'], schema['tables'])
+
+
+def _unix_seconds(values):
+    return (pd.to_datetime(values, errors='coerce', format='%Y-%m-%d') - pd.Timestamp(0)).dt.total_seconds()
 
 
 ##########################################################################################
 #
-# START EDGE LIST CONSTRUCTION
+# START AutoRDF2GML Content-based (CB) Node Features Version
 #
 ##########################################################################################
 
-print(f"## Edge list construction...")
-
-#Binary edges (refed to as simple edges)
-simple_edge_lists = {}
-for var_name in simple_edge_dict.keys():
-    edge_list_name = f"edge_list_{var_name}"
-    globals()[edge_list_name] = []
-    simple_edge_lists[edge_list_name] = globals()[edge_list_name]
-
-for edges, edge_list in zip(simple_edge_dict.values(), simple_edge_lists.values()):
-    subject_value, predicte_value, object_value = edges
-    for a in subject_value:
-        for b in object_value:
-            for p in predicte_value:
-                query = """
-                    SELECT DISTINCT ?a ?c
-                    WHERE {
-                        ?a rdf:type ?class_a .
-                        ?c rdf:type ?class_b .
-                        ?a ?b ?c .
-                        }
-                    """
-            
-                query_replace = query.replace("?class_a", f"<{a}>").replace("?class_b", f"<{b}>").replace("?b", f"<{p}>")
-                for row in graph.query(query_replace):
-                    edge_list.append(row)
-                    
-
-##### binary edges done ######
-
-#N-aray edges with features
-n_aray_edge_lists = {}
-for var_name in n_aray_edge_dict.keys():
-    edge_list_name = f"edge_list_{var_name}"
-    globals()[edge_list_name] = []
-    n_aray_edge_lists[edge_list_name] = globals()[edge_list_name]
-
-n_aray_edge_feature_lists = {}
-for var_name in n_aray_edge_dict.keys():
-    edge_list_name = f"edge_feature_list_{var_name}"
-    globals()[edge_list_name] = []
-    n_aray_edge_feature_lists[edge_list_name] = globals()[edge_list_name]
-
-for naray_e, naray_feature_path, naray_feature_value, edge_list, edge_feature_list in zip(n_aray_edge_dict.values(), n_aray_feature_path_dict.values(), n_aray_feature_value_dict.values(), n_aray_edge_lists.values(), n_aray_edge_feature_lists.values()):
-    subject_value, predicte_value, object_value = naray_e
-    
-    for a in subject_value:
-        for b in object_value:
-            for p in predicte_value:
-                query_a = """
-                        SELECT DISTINCT ?a ?c
-                        WHERE {
-                            ?a rdf:type ?class_a .
-                            ?c rdf:type ?class_b .
-                            ?a ?b ?c .
-                        }
-                    """
-                query_replace_a = query_a.replace("?class_a", f"<{a}>").replace("?class_b", f"<{b}>").replace("?b", f"<{p}>")
-                for row in graph.query(query_replace_a):
-                    edge_list.append(row)
-    
-    
-    for row in edge_list:
-        uri_a = row[0]
-        uri_b = row[1]
-
-
-        query_b = """
-        SELECT DISTINCT ?f
-        WHERE {
-            $uri_a ?b ?c .
-            ?c ?d $uri_b .
-            ?c ?e ?f .
-        }
-        """  
-        propertie_a = naray_feature_path[0]
-        propertie_b = naray_feature_path[1]
-        propertie_c = naray_feature_value
-        query_replace_b = query_b.replace("$uri_a", f"<{uri_a}>").replace("$uri_b", f"<{uri_b}>").replace("?b", f"<{propertie_a}>").replace("?d", f"<{propertie_b}>").replace("?e", f"<{propertie_c}>")
-
-        result = [row["f"].toPython() for row in graph.query(query_replace_b)]
-        edge_feature_list.append(result)
-                    
-##### n-aray edges done ######
-
-
-#n-hop edges
-n_hop_edge_lists = {}
-for var_name in n_hop_edge_dict.keys():
-    edge_list_name = f"edge_list_{var_name}"
-    globals()[edge_list_name] = []
-    n_hop_edge_lists[edge_list_name] = globals()[edge_list_name]
-
-
-def nested_loops(list_of_lists, result_list, class_a, class_x):
-    list_of_lists = list_of_lists[1:-1]
-
-    def _nested_loops_recursion(lists, current_combination):
-        if not lists:
-            query_a = create_sparql_query(current_combination, class_a, class_x)
-            print(f"\n--- N-Hop Query for {class_a} -> {class_x} via {current_combination} ---")
-            print(query_a)
-            print(f"---------------------------\n")
-  
-            for row in graph.query(query_a):
-                result_list.append(row)
-            
-            return
-
-        for item in lists[0]:
-            _nested_loops_recursion(lists[1:], current_combination + [item])
-
-    _nested_loops_recursion(list_of_lists, [])
-
-
-def create_sparql_query(current_combination, class_a, class_x):
-    triples = ""
-    prev_var = "?a"
-    for i, prop in enumerate(current_combination):
-        var = f"?c{i+1}" if i < len(current_combination) - 1 else "?x"
-        triples += f"{prev_var} <{prop}> {var} .\n"
-        prev_var = var
-
-    query_a = f"""
-        SELECT DISTINCT ?a ?x
-        WHERE {{
-            ?a rdf:type <{class_a}> .
-            ?x rdf:type <{class_x}> .
-            {triples}
-        }}
+class ContentConverter:
+    """Content-based RDF to graph converter.
+
+    Built once from a parsed config; `convert` can then be called for any number of
+    RDF files or rdflib graphs in the same process.
     """
-    return query_a
 
+    def __init__(self, config):
+        #a ConfigParser is compiled (and validated) here, a compiled plan is used as is
+        if isinstance(config, ConversionPlan):
+            self.config, self.plan = None, config
+            if self.plan.content is None:
+                raise ConfigError("The plan has no content-based settings ([NLD], [EMBEDDING])")
+        else:
+            self.config, self.plan = config, compile_plan(config, content=True, topology=False)
+        settings = self.plan.content
+
+        self.file_path = self.plan.input_path
+        self.triple_cache_dir = self.plan.triple_cache_dir
+        self.save_path_numeric_graph = self.plan.save_path_numeric_graph
+        self.save_path_mapping = self.plan.save_path_mapping
+        self.output_format = self.plan.output_format
+        self.sparse_categorical = self.plan.sparse_categorical
+        self.nld_class = settings.nld_class
+        self.pivoted_df_nld = f"pivoted_df_{self.nld_class}"
+        self.embedding_model = settings.embedding_model
+        self.embedding_batch_size = settings.embedding_batch_size
+        self.embedding_num_threads = settings.embedding_num_threads
+        self.embedding_cache_path = settings.embedding_cache_path
+        self.embedding_cache_max_entries = settings.embedding_cache_max_entries
+        self._embedder = None
+        self.correlation_block_size = settings.correlation_block_size
+        self.profile_sample_size = settings.profile_sample_size
+        self.feature_schema_path = settings.feature_schema_path
+        self._feature_schema = None
+
+        #classes and edges with resolved URIRefs, node types at both ends of every edge
+        self.class_names = self.plan.class_names
+        self.class_dict = self.plan.class_dict
+        self.edge_node_types = self.plan.edge_node_types
+
+    @property
+    def embedder(self):
+        #loaded on first use and shared with every other converter of the process
+        if self._embedder is None:
+            self._embedder = get_embedder(self.embedding_model, batch_size=self.embedding_batch_size, num_threads=self.embedding_num_threads,
+                                          cache_path=self.embedding_cache_path, cache_max_entries=self.embedding_cache_max_entries)
+        return self._embedder
+
+    @property
+    def feature_schema(self):
+        #None without a schema_path, the features are then selected per file
+        if self._feature_schema is None and self.feature_schema_path:
+            if not os.path.exists(self.feature_schema_path):
+                raise FileNotFoundError(f"No feature schema at {self.feature_schema_path}, fit one first with --fit_schema")
+            self._feature_schema = FeatureSchema.load(self.feature_schema_path)
+        return self._feature_schema
+
+    def fit_schema(self, graphs_or_paths, schema_path=None):
+        """Fit a FeatureSchema on the node tables of a sample of designs and save it
+        to schema_path (default: [FeatureSelection] schema_path)."""
+        schema_path = schema_path or self.feature_schema_path
+        samples = [self._build_node_tables(self.load_index(graph_or_path)) for graph_or_path in graphs_or_paths]
+        print(f"## Fitting the feature schema on {len(samples)} designs...")
+        schema = FeatureSchema.fit(samples, self.pivoted_df_nld, sample_size=self.profile_sample_size, correlation_block_size=self.correlation_block_size)
+        if schema_path:
+            schema.save(schema_path)
+            print(f"## Feature schema saved at: {schema_path}")
+        self._feature_schema = schema
+        return schema
+
+    @classmethod
+    def from_config_path(cls, config_path):
+        return cls(ConversionPlan.from_config_path(config_path, content=True, topology=False))
+
+    def load_index(self, graph_or_path=None):
+        #defaults to the [InputPath] file, see load_triple_index
+        return load_triple_index(graph_or_path if graph_or_path is not None else self.file_path, self.triple_cache_dir)
+
+    def convert(self, graph_or_path=None):
+        """Convert one RDF graph (or N-Triples file, optionally .nt.gz / .nt.bz2) into node and edge tables.
+
+        Returns a dict with the pivoted node feature frames under 'nodes' (keyed
+        `pivoted_df_<class>`, with the entity URIs in the 'subject' column), the
+        URI -> local id table under 'node_index', the (2, num_edges) int64 edge
+        indices under 'edges' (keyed `edge_list_<edge>`) and the raw n-aray edge
+        feature values under 'edge_features' (float32, one row per n-aray edge and
+        one column per feature value predicate).
+        """
+        #one pass over the triples replaces the per-class and per-edge SPARQL queries
+        index = self.load_index(graph_or_path)
+
+        print(f"## Transformation started!")
+        print(f"## Checking RDF graph triples. First triple (if any):")
+
+        for s, p, o in index.triples():
+            print(f"  {s} {p} {o}")
+            break # Just print the first one to confirm it's loaded
+        if not len(index):
+            print("  WARNING: RDF graph appears empty! Check file_path and format.")
+
+        nodes_data_pivoted_df = self._build_node_tables(index)
+        nodes_data_pivoted_df = self._select_features(nodes_data_pivoted_df)
+        simple_edge_lists, n_aray_edge_lists, n_aray_edge_feature_lists, n_hop_edge_lists = self._build_edge_lists(index)
+
+        edge_lists = {}
+        edge_lists.update(simple_edge_lists)
+        edge_lists.update(n_aray_edge_lists)
+        edge_lists.update(n_hop_edge_lists)
+
+        node_index = NodeIndex({class_name: nodes_data_pivoted_df[f'pivoted_df_{class_name}']['subject'] for class_name in self.class_names})
+        edge_indices = node_index.remap_edge_lists(edge_lists, self.edge_node_types)
+
+        #drop the feature rows of n-aray edges dropped by the remapping
+        edge_features = {}
+        for key, value in n_aray_edge_feature_lists.items():
+            edge_name = key[len('edge_feature_list_'):]
+            src_type, dst_type = self.edge_node_types[edge_name]
+            _, mapped = node_index.remap_edges(n_aray_edge_lists[f'edge_list_{edge_name}'], src_type, dst_type)
+            edge_features[key] = value[mapped]
+
+        return {
+            'nodes': nodes_data_pivoted_df,
+            'node_index': node_index,
+            'edges': edge_indices,
+            'edge_features': edge_features,
+        }
 
-for nhop_edge, nhop_list in zip(n_hop_edge_dict.values(), n_hop_edge_lists.values()):
-    class_a_list = nhop_edge[0]
-    class_x_list = nhop_edge[-1]
-    
-    for class_a in class_a_list:
-        for class_x in class_x_list:
-            nested_loops(nhop_edge, nhop_list, class_a, class_x)
+    def _build_node_tables(self, index):
+        nodes_data_df = {}
+        for class_name in self.class_names:
+            nodes_data_df[f'df_{class_name}'] = pd.DataFrame(columns=["subject", "predicate", "object"])
 
-##### n-hop edges done ######
+        nodes_data_pivoted_df = {}
+        for class_name in self.class_names:
+            nodes_data_pivoted_df[f'pivoted_df_{class_name}'] = pd.DataFrame()
 
+        for node_class, node_data_df in zip(self.class_dict.values(), nodes_data_df.items()):
+            key, value = node_data_df
 
-##########################################################################################
-#
-# END EDGE LIST CONSTRUCTION
-#
-##########################################################################################
+            all_rows = []
+            for class_uri in node_class:
+                all_rows.extend(index.class_triples(class_uri))
 
-print(f"## Saving the result...")
-folder_check(save_path_numeric_graph)
-folder_check(save_path_mapping)
-
-#map the uris to idx
-mapping_df = {}
-for var_name in class_names:
-    mapping_df[f'mapping_df_{var_name}'] = pd.DataFrame()
-
-
-def read_mapping(mapping_df):
-    mapping = {}
-    for _, row in mapping_df.iterrows():
-        mapping[row[1]] = row[0]
-    return mapping
-
-
-for data_pivoted_df, data_mapping_df in zip(nodes_data_pivoted_df.items(), mapping_df.items()):
-    key_pivot, value_pivot = data_pivoted_df
-    key_mapping, value_mapping = data_mapping_df
-    
-    unique_user_id = value_pivot["subject"].unique()
-    unique_user_id = pd.DataFrame(data={
-    'userId': unique_user_id,
-    'mappedID': pd.RangeIndex(len(unique_user_id)),
-    })
-   
-    
-    mapping_df[key_mapping] = read_mapping(unique_user_id)
-    for key, value in mapping_df[key_mapping].items():
-        if isinstance(value, URIRef):
-            mapping_df[key_mapping][key] = str(value)
-            
-
-
-for key, value in nodes_data_pivoted_df.items():
-    value_copy = value.copy()
-    value_copy.drop(['subject'], axis=1, inplace=True)
-    filename = key + ".csv"
-    file_path = os.path.join(save_path_numeric_graph, filename)
-    value_copy.to_csv(file_path, index=False, header=False)
-
-
-for key, value in nodes_data_pivoted_df.items():
-    value_copy = value[['subject']].copy()
-    value_copy['mapping'] = range(len(value_copy))
-    filename = key + ".csv"
-    file_path = os.path.join(save_path_mapping, filename)
-    value_copy.to_csv(file_path, index=False)
-
-
-def invert_mapping(mapping):
-    return {v: k for k, v in mapping.items()}
-
-
-#save binary edges (simple edges)
-for key, value in simple_edge_lists.items():
-    df = pd.DataFrame(value) 
-    
-    for key_mapping, value_mapping in mapping_df.items():
-        inverted_mapping = invert_mapping(value_mapping)
-        df = df.astype(str)
-        df = df.replace(inverted_mapping) 
-    
-
-    filename = key + ".csv" 
-    file_path = os.path.join(save_path_numeric_graph, filename)
-    
-    df.to_csv(file_path, index=False, header=False)
-
-
-
-#save n-aray edges
-for key, value in n_aray_edge_lists.items():
-    df = pd.DataFrame(value)
-    
-    for key_mapping, value_mapping in mapping_df.items():
-        inverted_mapping = invert_mapping(value_mapping)
-        df = df.astype(str)
-        df = df.replace(inverted_mapping) 
-
-    filename = key + ".csv" 
-    file_path = os.path.join(save_path_numeric_graph, filename) 
-    
-    df.to_csv(file_path, index=False, header=False)
-
-
-#save n-hop edges
-for key, value in n_hop_edge_lists.items():
-    df = pd.DataFrame(value) 
-    
-    for key_mapping, value_mapping in mapping_df.items():
-        inverted_mapping = invert_mapping(value_mapping)
-        df = df.astype(str)
-        df = df.replace(inverted_mapping) 
-    
-    filename = key + ".csv" 
-    file_path = os.path.join(save_path_numeric_graph, filename) 
-    
-    df.to_csv(file_path, index=False, header=False)
-
-
-
-#Transform edge features
-def edge_label_encode_categorical_columns(df):
-    le = LabelEncoder()
-    cat_cols = [col for col in df.columns if df[col].dtype == 'object' and 5 < df[col].nunique() <= 100]
-    for col in cat_cols:
-        if col not in cols_to_keep:
-            mask = df[col].notna() & (df[col] != '')
-            # Convert only non-NaN and non-empty values to string and then encode them
-            df.loc[mask, col] = le.fit_transform(df.loc[mask, col].astype(str))
-            # Replace NaN and empty values with median of the column
-            median_value = df[col].astype(np.float64).median()
-            df[col].fillna(median_value, inplace=True)
-            df.loc[df[col] == '', col] = median_value
+            new_rows_df = pd.DataFrame(all_rows, columns=["subject", "predicate", "object"])
+            value = pd.concat([value, new_rows_df], ignore_index=True)
+            nodes_data_df[key] = value
 
-    return df
+        #deletes object properties with URIRef
+        for key, value in nodes_data_df.items():
+            indices_to_drop = value[value['object'].apply(lambda x: isinstance(x, rdflib.URIRef))].index
 
+            value.drop(indices_to_drop, inplace=True)
 
-def edge_one_hot_encode_categorical_columns(df):
-    cat_cols = [col for col in df.columns if df[col].dtype == 'object' and 1 <= df[col].nunique() <= 5]
-    for col in cat_cols:
-        if col not in cols_to_keep:
-            # One-hot encode with NaN as a separate category
-            dummies = pd.get_dummies(df[col], prefix=col, dummy_na=True)
-            df = pd.concat([df, dummies], axis=1)
-            # Drop the original column after one-hot encoding
-            df.drop(columns=[col], inplace=True)
+        for data_df, data_pivoted_df in zip(nodes_data_df.items(), nodes_data_pivoted_df.items()):
+            key, value = data_df
+            key_pivot, value_pivot = data_pivoted_df
 
-    return df
+            grouped_df = nodes_data_df[key].groupby(['subject', 'predicate'])['object'].apply(join_with_comma).reset_index()
+
+            pivoted_df_temp = grouped_df.pivot(index='subject', columns='predicate', values='object').reset_index()
+
+            nodes_data_pivoted_df[key_pivot] = pd.concat([value_pivot, pivoted_df_temp], axis=1)
+
+        return nodes_data_pivoted_df
+
+    def _select_features(self, nodes_data_pivoted_df):
+        if self.feature_schema is not None:
+            print(f"## Applying the fitted feature schema...")
+            return self.feature_schema.transform(nodes_data_pivoted_df, self.embedder)
+
+        print(f"## Automatic feature selection...")
+
+        #Find NLD columns
+        print (f'## NLD column: {self.pivoted_df_nld}')
+
+        text_columns = find_text_columns(nodes_data_pivoted_df[self.pivoted_df_nld])
+
+        cols_to_keep = []
+        cols_to_keep.append('subject')
+        cols_to_keep.append('string-values')
+
+        for col in text_columns:
+            cols_to_keep.append(col)
+
+        #Apply the automatic feature selection and transformation
+        for key, value in nodes_data_pivoted_df.items():
+
+            value = merge_columns(value, text_columns)
+            profile = profile_columns(value, sample_size=self.profile_sample_size)
+            value = preprocess_dataframe(value, cols_to_keep, profile)
+            value = one_hot_encode_categorical_columns(value, cols_to_keep, profile)
+            value = label_encode_categorical_columns(value, cols_to_keep, profile)
+            value = delete_uri_columns(value, cols_to_keep, profile)
+            value = remove_highly_correlated_columns(value, cols_to_keep, block_size=self.correlation_block_size)
+            value = convert_datetime_to_unix(value, profile)
+            value = normalize_large_values(value)
+            value = embed_strings(value, 'string-values', self.embedder)
+
+            # Update the value in the original dictionary
+            nodes_data_pivoted_df[key] = value
+
+        #split the nld embeddings column into sepeate columns
+        for key, value in nodes_data_pivoted_df.items():
+            if 'embeddings' in value.columns:
+
+                embeddings = pd.DataFrame(value['embeddings'].to_list(), columns=[f'embedding_{i}' for i in range(128)])
+
+                value.drop('embeddings', axis=1, inplace=True)
+
+                value = pd.concat([value.reset_index(drop=True), embeddings.reset_index(drop=True)], axis=1)
+
+                nodes_data_pivoted_df[key] = value
+
+        if self.embedder.cache is not None:
+            print(f"## Embedding cache: {self.embedder.cache.stats()}")
+
+        #Delte the 'string-values' column
+        for key, value in nodes_data_pivoted_df.items():
+            if 'string-values' in value.columns:
+                value.drop('string-values', axis=1, inplace=True)
+                nodes_data_pivoted_df[key] = value
+
+        return nodes_data_pivoted_df
+
+    def _build_edge_lists(self, index):
+        print(f"## Edge list construction...")
+
+        #Binary edges (refed to as simple edges)
+        simple_edge_lists = {}
+        for edge in self.plan.simple_edges:
+            simple_edge_lists[f"edge_list_{edge.name}"] = index.class_edges(edge.start_classes, edge.hops[0], edge.end_classes)
+
+        ##### binary edges done ######
+
+        #N-aray edges with features
+        n_aray_edge_lists = {}
+        n_aray_edge_feature_lists = {}
+        for edge in self.plan.n_aray_edges:
+            edge_list = n_aray_edge_lists[f"edge_list_{edge.name}"] = index.class_edges(edge.start_classes, edge.hops[0], edge.end_classes)
+
+            n_aray_edge_feature_lists[f"edge_feature_list_{edge.name}"] = n_aray_edge_features(index, edge_list, edge.feature_path, edge.feature_values)
+
+        ##### n-aray edges done ######
+
+        #n-hop edges, every combination of the hop properties is a property path, all resolved at once
+        n_hop_edge_lists = {}
+        for edge in self.plan.n_hop_edges:
+            n_hop_edge_lists[f"edge_list_{edge.name}"] = index.hop_edges(edge.start_classes, edge.hops, edge.end_classes)
+
+        ##### n-hop edges done ######
+
+        return simple_edge_lists, n_aray_edge_lists, n_aray_edge_feature_lists, n_hop_edge_lists
+
+    def numeric_features(self, table):
+        """The model input of one node table: the frame without its 'subject' column
+        and, with sparse_categorical, its one-hot columns split off as a CSR matrix
+        (None otherwise)."""
+        features = table.drop(columns=['subject'])
+        if not self.sparse_categorical:
+            return features, None
+        return split_categorical(features)
+
+    def save(self, tables, save_path_numeric_graph=None, save_path_mapping=None):
+        save_path_numeric_graph = save_path_numeric_graph or self.save_path_numeric_graph
+        save_path_mapping = save_path_mapping or self.save_path_mapping
+        nodes_data_pivoted_df = tables['nodes']
+
+        print(f"## Saving the result...")
+        folder_check(save_path_numeric_graph)
+        folder_check(save_path_mapping)
+
+        for key, value in nodes_data_pivoted_df.items():
+            value_copy, categorical = self.numeric_features(value)
+            if categorical is not None:
+                #one-hot columns go to a CSR pivoted_df_<class>_categorical table, the rest stays dense
+                save_table(categorical, save_path_numeric_graph, f'{key}_categorical', self.output_format, dtype=np.float32)
+            else:
+                update_manifest(save_path_numeric_graph, {f'{key}_categorical': None})
+            save_table(value_copy, save_path_numeric_graph, key, self.output_format, dtype=np.float32)
+
+        for key, value in nodes_data_pivoted_df.items():
+            value_copy = value[['subject']].copy()
+            value_copy['mapping'] = range(len(value_copy))
+            filename = key + ".csv"
+            file_path = os.path.join(save_path_mapping, filename)
+            value_copy.to_csv(file_path, index=False)
+
+        #save simple, n-aray and n-hop edges as local ids of the node tables
+        for key, value in tables['edges'].items():
+            save_table(value.T, save_path_numeric_graph, key, self.output_format, dtype=np.int64)
+
+        print(f"## Result saved at: {save_path_mapping=} {save_path_numeric_graph}")
+
+
+def main():
+    args = _get_parser().parse_args()
+
+    print(f"## AutoRDF2GML (content-based): START! ##")
+    start_time = time.time()
+    print(f"## {start_time=}")
+    print(f"## Loading the config file: {args.config_path}")
+    converter = ContentConverter.from_config_path(args.config_path)
+
+    print (f'## Configs: input:{converter.file_path} / {converter.nld_class=} / {converter.embedding_model=} / output:{converter.save_path_mapping=} {converter.save_path_numeric_graph}')
+
+    if args.fit_schema:
+        converter.fit_schema(args.fit_schema)
+        print("--- %.2f seconds ---" % (time.time() - start_time))
+        return
+
+    folder_check(converter.save_path_numeric_graph)
+    folder_check(converter.save_path_mapping)
 
+    tables = converter.convert()
+    converter.save(tables)
+    print(f"## Finished creating the graph dataset!")
 
-# for key, value in n_aray_edge_feature_lists.items():
-    
-#     df = pd.DataFrame({'Value': pd.Series([item[0] for item in value])})
-#     df = edge_one_hot_encode_categorical_columns(df)
-#     df = edge_label_encode_categorical_columns(df)
-#     filename = key + ".csv" 
-#     file_path = os.path.join(save_path_numeric_graph, filename)
-    
-#     df.to_csv(file_path, index=False, header=False)
+    ######## Automatic graph creation done ########
 
-print(f"## Result saved at: {save_path_mapping=} {save_path_numeric_graph}")
-print(f"## Finished creating the graph dataset!")
+    print("--- %.2f seconds ---" % (time.time() - start_time))
+    print(f"## AutoRDF2GML (content-based): END!")
 
-######## Automatic graph creation done ########
 
-print("--- %.2f seconds ---" % (time.time() - start_time))
-print(f"## AutoRDF2GML (content-based): END!")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import time
+import argparse
+import numpy as np
+
+from autordf2gml import ContentConverter, folder_check
+from autordf2gml_tb import TopologyConverter
+from graph_tables import save_table
+from conversion_plan import ConversionPlan, compile_plan
+
+
+def _get_parser():
+  parser = argparse.ArgumentParser()
+  #a content-based and a topology-based config (e.g. config.ini top-config.ini) are merged in order
+  parser.add_argument("--config_path", type=str, nargs='+', default=['config.ini', 'top-config.ini'])
+  return parser
+
+
+class CombinedConverter:
+    """Content-based and topology-based node features from a single parse.
+
+    The graph is indexed once; the content-based converter builds the node tables
+    and edge lists, and the KG embedding of every node is gathered in the row
+    order of its content-based table. Both feature blocks share one node index, so
+    no realignment by URI is needed afterwards.
+    """
+
+    def __init__(self, config):
+        #compiled once, both converters share the plan
+        self.plan = config if isinstance(config, ConversionPlan) else compile_plan(config, content=True, topology=True)
+        self.content = ContentConverter(self.plan)
+        self.topology = TopologyConverter(self.plan)
+
+    @classmethod
+    def from_config_path(cls, config_path):
+        return cls(ConversionPlan.from_config_path(config_path, content=True, topology=True))
+
+    def convert(self, graph_or_path=None):
+        """Like ContentConverter.convert, plus the KG embeddings under 'topology'
+        (keyed `pivoted_df_topology_<class>`, float32, rows in node table order).
+        """
+        index = self.content.load_index(graph_or_path)
+        tables = self.content.convert(index)
+
+        print(f"## Topology-based features..")
+        entity_dict, entity_embeddings = self.topology.embed(index)
+        return self._add_topology(tables, entity_dict, entity_embeddings)
+
+    def convert_many(self, graphs_or_paths):
+        """convert for many designs, their KG embeddings trained together in one
+        disjoint-union model (TopologyConverter.embed_many)."""
+        indices = [self.content.load_index(graph_or_path) for graph_or_path in graphs_or_paths]
+        all_tables = [self.content.convert(index) for index in indices]
+
+        print(f"## Topology-based features of {len(indices)} designs..")
+        embedded = self.topology.embed_many(indices)
+        return [self._add_topology(tables, entity_dict, entity_embeddings) for tables, (entity_dict, entity_embeddings) in zip(all_tables, embedded)]
+
+    def _add_topology(self, tables, entity_dict, entity_embeddings):
+        #KG embedding rows gathered in the row order of the content-based node tables
+        topology = {}
+        for class_name in self.content.class_names:
+            subjects = tables['nodes'][f'pivoted_df_{class_name}']['subject']
+            rows = np.fromiter((entity_dict.get(subject, -1) for subject in subjects), dtype=np.int64, count=len(subjects))
+            found = rows >= 0
+            if not found.all():
+                print(f"## {class_name}: {(~found).sum()} entities not in the embedded triples, zero topology features")
+
+            block = np.zeros((len(rows), entity_embeddings.shape[1]), dtype=np.float32)
+            block[found] = entity_embeddings[rows[found]]
+            topology[f'pivoted_df_topology_{class_name}'] = block
+
+        tables['topology'] = topology
+        return tables
+
+    def save(self, tables, save_path_numeric_graph=None, save_path_mapping=None):
+        save_path_numeric_graph = save_path_numeric_graph or self.content.save_path_numeric_graph
+        self.content.save(tables, save_path_numeric_graph, save_path_mapping)
+        for key, value in tables['topology'].items():
+            save_table(value, save_path_numeric_graph, key, self.content.output_format, dtype=np.float32)
+
+
+def main():
+    args = _get_parser().parse_args()
+
+    print(f"## AutoRDF2GML (combined): START! ##")
+    start_time = time.time()
+    print(f"## {start_time=}")
+    print(f"## Loading the config files: {args.config_path}")
+    converter = CombinedConverter.from_config_path(args.config_path)
+
+    folder_check(converter.content.save_path_numeric_graph)
+    folder_check(converter.content.save_path_mapping)
+
+    tables = converter.convert()
+    converter.save(tables)
+    print(f"## Finished creating the graph dataset!")
+
+    print("--- %.2f seconds ---" % (time.time() - start_time))
+    print(f"## AutoRDF2GML (combined): END!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,547 @@
+from rdflib import URIRef, RDF
+import numpy as np
+import pandas as pd
+import torch
+from torch_geometric.data import Data
+from torch_geometric.transforms import RandomLinkSplit
+from torch_geometric import seed_everything
+# from torch_geometric.nn import TransE
+from torch_geometric.nn import ComplEx, DistMult, TransE
+import torch.optim as optim
+import os
+import pickle
+
+import argparse, time
+from tqdm import tqdm
+from graph_tables import NodeIndex, save_table, update_manifest
+from conversion_plan import ConversionPlan, ConfigError, compile_plan
+from triple_index import load_triple_index
+
+def _get_parser():
+  parser = argparse.ArgumentParser()
+  parser.add_argument("--config_path", type=str, default='use-case-aifb/config-aifb.ini')
+  #trains the embedding of [MODEL] shared_embedding on these RDF files and exits
+  parser.add_argument("--fit_shared_embedding", type=str, nargs='+', default=None)
+  parser.add_argument("--shard_size", type=int, default=None)
+  # parser.add_argument("--config", type=str, default='config.ini')
+  return parser
+
+def folder_check(mpath):
+  if os.path.isdir(mpath):
+    print (f'## Path exists: {mpath}')
+  else:
+    os.makedirs(mpath, exist_ok=True)
+    print (f'## Path {mpath} created!')
+
+model_map = {
+    'transe': TransE,
+    'complex': ComplEx,
+    'distmult': DistMult,
+}
+
+
+def _first_appearance(values):
+    #distinct values in order of their first occurrence
+    uniques, first = np.unique(values, return_index=True)
+    return uniques[np.argsort(first)]
+
+
+def _sample_within_designs(model, entity_offsets):
+    #negatives of a disjoint-union model: the corrupted head or tail is drawn from
+    #the entities of the triple's own design (ids entity_offsets[k]..entity_offsets[k+1])
+    offsets = torch.as_tensor(np.asarray(entity_offsets), dtype=torch.long)
+
+    @torch.no_grad()
+    def random_sample(head_index, rel_type, tail_index):
+        design_offsets = offsets.to(head_index.device)
+        design = torch.searchsorted(design_offsets, head_index, right=True) - 1
+        start, size = design_offsets[design], design_offsets[design + 1] - design_offsets[design]
+        rnd_index = start + torch.randint(1 << 62, head_index.size(), device=head_index.device) % size
+
+        #same split as KGEModel.random_sample, heads of the first half, tails of the second
+        num_negatives = head_index.numel() // 2
+        head_index = head_index.clone()
+        head_index[:num_negatives] = rnd_index[:num_negatives]
+        tail_index = tail_index.clone()
+        tail_index[num_negatives:] = rnd_index[num_negatives:]
+        return head_index, rel_type, tail_index
+
+    model.random_sample = random_sample
+
+
+def _save_csv_tables(value, save_path, key):
+    #the feature block is formatted to text once and written twice: headerless as
+    #<key>.csv and with a header and the subjects as uri_list_<class>.csv
+    features = value.drop(columns=['subject']).to_numpy(dtype=np.float64)
+    lines = pd.DataFrame(features).to_csv(header=False, index=False)
+    with open(os.path.join(save_path, key + '.csv'), 'w') as file:
+        file.write(lines)
+    update_manifest(save_path, {key: None})
+
+    subjects = pd.DataFrame({'subject': value['subject'].astype(str)}).to_csv(header=False, index=False).splitlines()
+    header = ','.join(value.columns)
+    with open(os.path.join(save_path, f"{key[len('pivoted_df_'):]}.csv"), 'w', newline='') as file:
+        file.write('\r\n'.join([header] + [f'{subject},{line}' for subject, line in zip(subjects, lines.splitlines())]) + '\r\n')
+
+
+class SharedEmbedding:
+    """KG embedding trained once over a corpus, see TopologyConverter.fit_shared_embedding.
+
+    Holds the entity and relation terms and every parameter table of the model
+    (node_emb, rel_emb, and the imaginary parts for ComplEx). The topology features
+    of a design are the node_emb rows of its entities, looked up by URI.
+    """
+
+    def __init__(self, entities, relations, parameters, kge_model):
+        self.entities = entities
+        self.relations = relations
+        self.parameters = parameters
+        self.kge_model = kge_model
+        self.entity_dict = {entity: row for row, entity in enumerate(entities)}
+
+    @property
+    def entity_embeddings(self):
+        return self.parameters['node_emb.weight']
+
+    def save(self, path):
+        #node_emb is its own .npy, so it can be memory-mapped on load
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'entity_embeddings.npy'), self.entity_embeddings)
+        np.savez(os.path.join(path, 'parameters.npz'), **{name: value for name, value in self.parameters.items() if name != 'node_emb.weight'})
+        with open(os.path.join(path, 'terms.pkl'), 'wb') as file:
+            pickle.dump({'entities': self.entities, 'relations': self.relations, 'kge_model': self.kge_model}, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        with open(os.path.join(path, 'terms.pkl'), 'rb') as file:
+            terms = pickle.load(file)
+        with np.load(os.path.join(path, 'parameters.npz')) as tables:
+            parameters = dict(tables)
+        parameters['node_emb.weight'] = np.load(os.path.join(path, 'entity_embeddings.npy'), mmap_mode=mmap_mode)
+        return cls(terms['entities'], terms['relations'], parameters, terms['kge_model'])
+
+
+##########################################################################################
+#
+# START AutoRDF2GML Topology-based (TB) Node Features Version
+#
+##########################################################################################
+
+class TopologyConverter:
+    """Topology-based RDF to graph converter.
+
+    Node features are knowledge graph embeddings (TransE / ComplEx / DistMult)
+    trained on the typed triples of the graph. Built once from a parsed config;
+    `convert` can then be called for any number of RDF files or rdflib graphs.
+    """
+
+    def __init__(self, config):
+        #a ConfigParser is compiled (and validated) here, a compiled plan is used as is
+        if isinstance(config, ConversionPlan):
+            self.config, self.plan = None, config
+            if self.plan.topology is None:
+                raise ConfigError("The plan has no topology-based settings ([MODEL], [EmbeddingClasses], [EmbeddingPredicates])")
+        else:
+            self.config, self.plan = config, compile_plan(config, content=False, topology=True)
+        settings = self.plan.topology
+
+        self.file_path = self.plan.input_path
+        self.triple_cache_dir = self.plan.triple_cache_dir
+        self.save_path_numeric_graph = self.plan.save_path_numeric_graph
+        self.save_path_mapping = self.plan.save_path_mapping
+        self.kge_model = settings.kge_model
+        self.max_epochs = settings.max_epochs
+        self.patience = settings.patience
+        self.min_delta = settings.min_delta
+        self.shared_embedding_path = settings.shared_embedding_path
+        self._shared_embedding = None
+        self.output_format = self.plan.output_format
+        self.class_list = list(settings.class_list)
+        self.pred_list = list(settings.pred_list)
+
+        #classes and edges with resolved URIRefs, node types at both ends of every edge
+        self.class_names = self.plan.class_names
+        self.class_dict = self.plan.class_dict
+        self.edge_node_types = self.plan.edge_node_types
+
+    @property
+    def shared_embedding(self):
+        #None without a shared_embedding path, every design is then embedded on its own
+        if self._shared_embedding is None and self.shared_embedding_path:
+            if not os.path.exists(self.shared_embedding_path):
+                raise FileNotFoundError(f"No shared embedding at {self.shared_embedding_path}, fit one first with --fit_shared_embedding")
+            self._shared_embedding = SharedEmbedding.load(self.shared_embedding_path)
+        return self._shared_embedding
+
+    @classmethod
+    def from_config_path(cls, config_path):
+        return cls(ConversionPlan.from_config_path(config_path, content=False, topology=True))
+
+    def load_index(self, graph_or_path=None):
+        #defaults to the [InputPath] file, see load_triple_index
+        return load_triple_index(graph_or_path if graph_or_path is not None else self.file_path, self.triple_cache_dir)
+
+    def convert(self, graph_or_path=None):
+        """Convert one RDF graph (or N-Triples file) into embedded node tables and edge lists.
+
+        Returns a dict with the node tables under 'nodes' (keyed
+        `pivoted_df_uri_list_<class>`, entity URIs in the 'subject' column followed
+        by the embedding), the URI -> local id table under 'node_index' and the
+        (2, num_edges) int64 edge indices under 'edges' (keyed `edge_list_<edge>`).
+        """
+        index = self.load_index(graph_or_path)
+
+        print(f"## Transformation started! Automatic features extraction..")
+        entity_dict, entity_embeddings = self.embed(index)
+        print(f"## Features creation done! Continue.. ")
+
+        return self._build_tables(index, entity_dict, entity_embeddings)
+
+    def convert_many(self, graphs_or_paths):
+        """convert for many designs, their KG embeddings trained together (see embed_many)."""
+        indices = [self.load_index(graph_or_path) for graph_or_path in graphs_or_paths]
+        embedded = self.embed_many(indices)
+        return [self._build_tables(index, entity_dict, entity_embeddings) for index, (entity_dict, entity_embeddings) in zip(indices, embedded)]
+
+    def _build_tables(self, index, entity_dict, entity_embeddings):
+        nodes_data_pivoted_df = self._build_node_tables(index, entity_dict, entity_embeddings)
+        edge_lists = self._build_edge_lists(index)
+
+        print(f"## Mapping.. ")
+
+        #URI -> local id of the entity in the node table of its class
+        node_index = NodeIndex({class_name: nodes_data_pivoted_df[f'pivoted_df_uri_list_{class_name}']['subject'] for class_name in self.class_names})
+        edge_indices = node_index.remap_edge_lists(edge_lists, self.edge_node_types)
+
+        return {
+            'nodes': nodes_data_pivoted_df,
+            'node_index': node_index,
+            'edges': edge_indices,
+        }
+
+    ##########################################################################################
+    #
+    # START TOPOLGY-BASED NODE FEATURES CREATION
+    #
+    ##########################################################################################
+
+    def embed(self, index):
+        """Train the KG embedding on the typed triples of index.
+
+        Returns the entity -> row dict and the (num_entities, 128) embedding matrix.
+        With a shared embedding configured nothing is trained, its corpus-wide
+        entity table is returned instead and the entities are gathered by URI.
+        """
+        if self.shared_embedding is not None:
+            return self.shared_embedding.entity_dict, self.shared_embedding.entity_embeddings
+
+        entities, relations, heads, rels, tails = self.typed_triples(index)
+        entity_dict = dict(zip(entities, range(len(entities))))
+        print(f"## {len(entity_dict)} entities, {len(relations)} relations, {len(heads)} triples to embed")
+
+        entity_embeddings = self._train_embeddings(heads, rels, tails, len(entity_dict))
+        return entity_dict, entity_embeddings
+
+    def embed_many(self, indices):
+        """embed for many designs as one disjoint-union problem.
+
+        The typed triples of all designs are stacked with entity and relation ids
+        offset per design, so each design keeps its own tables, and are trained
+        in one model with a batch size of 2000 per design. The entity table is
+        split back into one (entity_dict, embeddings) pair per design. Negative
+        samples are drawn from the entities of each triple's own design, as if
+        the designs were trained separately. The shared batches and training
+        steps still couple them: a design's embeddings depend on which designs
+        it is trained with, use embed for results that do not.
+        """
+        if self.shared_embedding is not None:
+            return [self.embed(index) for index in indices]
+
+        designs = [self.typed_triples(index) for index in indices]
+        entity_offsets = np.cumsum([0] + [len(entities) for entities, *_ in designs])
+        relation_offsets = np.cumsum([0] + [len(relations) for _, relations, *_ in designs])
+        heads = np.concatenate([design[2] + offset for design, offset in zip(designs, entity_offsets)]) if designs else np.empty(0, dtype=np.int64)
+        rels = np.concatenate([design[3] + offset for design, offset in zip(designs, relation_offsets)]) if designs else np.empty(0, dtype=np.int64)
+        tails = np.concatenate([design[4] + offset for design, offset in zip(designs, entity_offsets)]) if designs else np.empty(0, dtype=np.int64)
+        print(f"## {len(designs)} designs, {entity_offsets[-1]} entities, {relation_offsets[-1]} relations, {len(heads)} triples to embed")
+
+        model = self._train_model(heads, rels, tails, int(entity_offsets[-1]), num_relations=int(relation_offsets[-1]), batch_size=2000 * max(len(designs), 1),
+                                  entity_offsets=entity_offsets)
+        node_emb = model.node_emb.weight.cpu().detach().numpy()
+
+        return [
+            (dict(zip(entities, range(len(entities)))), node_emb[start:stop])
+            for (entities, *_), start, stop in zip(designs, entity_offsets[:-1], entity_offsets[1:])
+        ]
+
+    def typed_triples(self, index):
+        """The triples of index between entities of the embedding classes.
+
+        Returns the entity and relation terms (object arrays, in order of first
+        appearance) and the head, relation and tail ids (int64 arrays) into them.
+        """
+        class_set = set(self.class_list)
+        pred_set = set(self.pred_list)
+
+        #RDF Data Preprocessing: per term flags, then one vectorized filter over the triples
+        terms, ids = index.encoded_triples()
+        s, p, o = ids[:, 0], ids[:, 1], ids[:, 2]
+        is_uri = np.fromiter((type(term) is URIRef for term in terms), dtype=bool, count=len(terms))
+        is_class = np.fromiter((term in class_set for term in terms), dtype=bool, count=len(terms))
+        is_pred = np.fromiter((term in pred_set for term in terms), dtype=bool, count=len(terms))
+        is_type = np.fromiter((term == RDF.type for term in terms), dtype=bool, count=len(terms))[p]
+
+        #entities with at least one rdf:type in class_list
+        allowed = np.zeros(len(terms), dtype=bool)
+        allowed[s[is_type & is_class[o]]] = True
+
+        #rdf:type triples need a listed class, all others typed URI endpoints of a listed class
+        keep = np.where(is_type, is_class[o], (~is_uri[o] | allowed[o]) & (~is_uri[s] | allowed[s]))
+        keep &= is_uri[o] & is_pred[p]
+        s, p, o = s[keep], p[keep], o[keep]
+
+        #entity and relation ids in order of first appearance, classes are no entities
+        candidates = np.stack([s, o], axis=1).ravel()
+        entities = _first_appearance(candidates[~is_class[candidates]])
+        relations = _first_appearance(p)
+        entity_ids = np.full(len(terms), -1, dtype=np.int64)
+        entity_ids[entities] = np.arange(len(entities))
+        relation_ids = np.full(len(terms), -1, dtype=np.int64)
+        relation_ids[relations] = np.arange(len(relations))
+
+        #rdf:type triples only register the subject, their object is a class
+        in_dict = (entity_ids[s] >= 0) & (entity_ids[o] >= 0)
+        return terms[entities], terms[relations], entity_ids[s[in_dict]], relation_ids[p[in_dict]], entity_ids[o[in_dict]]
+
+    def _train_embeddings(self, heads, rels, tails, num_entities):
+        model = self._train_model(heads, rels, tails, num_entities)
+        return model.node_emb.weight.cpu().detach().numpy()
+
+    def _train_model(self, heads, rels, tails, num_entities, num_relations=None, init=None, batch_size=2000, entity_offsets=None):
+        #init: parameter name -> array, warm starts the leading rows of every embedding table
+        #entity_offsets: first entity id of every design of a disjoint union, negatives stay within a design
+        kge_model = self.kge_model
+
+        data = Data(edge_index=torch.from_numpy(np.stack([heads, tails])),
+                    edge_type=torch.from_numpy(rels),
+                    num_nodes=num_entities)
+
+
+        #optional seed for reproducibility
+        seed_everything(42)
+
+        #we use 100% of the data for training
+        transform = RandomLinkSplit(
+            num_val=0.0,
+            num_test=0.0,
+        )
+        train_data, val_data, test_data = transform(data)
+
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+
+        #Define the model. Default model is TransE with 128 hidden channels
+        model = model_map[kge_model](
+            num_nodes=num_entities,
+            num_relations=num_relations or train_data.num_edge_types,
+            hidden_channels=128,
+        ).to(device)
+
+        if init:
+            with torch.no_grad():
+                for name, param in model.named_parameters():
+                    if name in init:
+                        param[:len(init[name])] = torch.from_numpy(np.asarray(init[name])).to(device)
+
+        if entity_offsets is not None:
+            _sample_within_designs(model, entity_offsets)
+
+        #Default Batch size is 2000
+        loader = model.loader(
+            head_index=train_data.edge_index[0].to(device),
+            rel_type=train_data.edge_type.to(device),
+            tail_index=train_data.edge_index[1].to(device),
+            batch_size=batch_size,
+            shuffle=True,
+        )
+
+        #Default optimizer is Adam with learning rate 0.001
+        optimizer = optim.Adam(model.parameters(), lr=0.001)
+
+
+        def train():
+            model.train()
+            total_loss = total_examples = 0
+            for head_index, rel_type, tail_index in loader:
+                optimizer.zero_grad()
+                loss = model.loss(head_index, rel_type, tail_index)
+                loss.backward()
+                optimizer.step()
+                total_loss += float(loss) * head_index.numel()
+                total_examples += head_index.numel()
+            return total_loss / total_examples
+
+        #Default number of epochs is 900; with patience > 0 training stops once the loss
+        #has not improved by more than min_delta for patience epochs
+        print(f"## Training the KG embedding...")
+        best_loss = float('inf')
+        stale_epochs = 0
+        reason = 'max_epochs'
+        progress = tqdm(range(1, self.max_epochs + 1), desc=f'Training')
+        for epoch in progress:
+            loss = train()
+            #print(f'Epoch: {epoch:03d}, Loss: {loss:.4f}')
+            if loss < best_loss - self.min_delta:
+                best_loss = loss
+                stale_epochs = 0
+            else:
+                stale_epochs += 1
+            if self.patience and stale_epochs >= self.patience:
+                reason = f'no improvement > {self.min_delta} for {self.patience} epochs'
+                break
+        progress.close()
+
+        print(f"## KG embedding training stopped at epoch {epoch}/{self.max_epochs} ({reason}), final loss {loss:.4f}, best loss {best_loss:.4f}")
+
+        return model
+
+    def fit_shared_embedding(self, graphs_or_paths, save_path=None, shard_size=None):
+        """Train one KG embedding over the typed triples of many designs and save it
+        to save_path (default: [MODEL] shared_embedding).
+
+        Entities and relations get corpus-wide ids, so an entity shared by several
+        designs has a single row. With shard_size the designs are trained shard by
+        shard, each shard warm starting from the tables of the previous ones.
+        """
+        save_path = save_path or self.shared_embedding_path
+        graphs_or_paths = list(graphs_or_paths)
+        shard_size = shard_size or len(graphs_or_paths)
+
+        entity_dict, relation_dict = {}, {}
+        parameters = None
+        for start in range(0, len(graphs_or_paths), shard_size):
+            shard = graphs_or_paths[start:start + shard_size]
+            triples = []
+            for graph_or_path in shard:
+                entities, relations, heads, rels, tails = self.typed_triples(self.load_index(graph_or_path))
+                entity_ids = np.array([entity_dict.setdefault(entity, len(entity_dict)) for entity in entities], dtype=np.int64)
+                relation_ids = np.array([relation_dict.setdefault(relation, len(relation_dict)) for relation in relations], dtype=np.int64)
+                triples.append(np.stack([entity_ids[heads], relation_ids[rels], entity_ids[tails]], axis=1))
+
+            #triples between shared entities come with every design, they are trained once
+            triples = np.unique(np.concatenate(triples), axis=0)
+            print(f"## Shared embedding, designs {start + 1}-{start + len(shard)}: {len(entity_dict)} entities, {len(relation_dict)} relations, {len(triples)} triples")
+            model = self._train_model(triples[:, 0], triples[:, 1], triples[:, 2], len(entity_dict), num_relations=len(relation_dict), init=parameters)
+            parameters = {name: param.cpu().detach().numpy() for name, param in model.named_parameters()}
+
+        shared = SharedEmbedding(list(entity_dict), list(relation_dict), parameters, self.kge_model)
+        if save_path:
+            shared.save(save_path)
+            print(f"## Shared embedding saved at: {save_path}")
+        self._shared_embedding = shared
+        return shared
+
+    ##########################################################################################
+    #
+    # END TOPOLGY-BASED NODE FEATURES CREATION
+    #
+    ##########################################################################################
+
+    def _build_node_tables(self, index, entity_dict, entity_embeddings):
+        nodes_data_pivoted_df = {}
+        columns = [f'feature_{i+1}' for i in range(entity_embeddings.shape[1])]
+        for class_name, node_class in self.class_dict.items():
+            #entities of the class in the row order of the content-based node tables
+            entity_list = np.array(index.sorted_entities(node_class), dtype=object)
+
+            #one gather of the embedding rows, entities without a row are reported together
+            rows = np.fromiter((entity_dict.get(entity, -1) for entity in entity_list), dtype=np.int64, count=len(entity_list))
+            found = rows >= 0
+            if not found.all():
+                print(f'## {class_name}: {(~found).sum()} entities not in triples: {set(entity_list[~found])}')
+
+            df = pd.DataFrame(np.asarray(entity_embeddings[rows[found]], dtype=np.float32), columns=columns)
+            df.insert(0, 'subject', entity_list[found])
+            nodes_data_pivoted_df[f'pivoted_df_uri_list_{class_name}'] = df
+
+        return nodes_data_pivoted_df
+
+    def _build_edge_lists(self, index):
+        print(f"## Edge list construction...")
+
+        #Binary edges (refed to as simple edges)
+        edge_lists = {}
+        for edge in self.plan.simple_edges:
+            edge_lists[f"edge_list_{edge.name}"] = index.class_edges(edge.start_classes, edge.hops[0], edge.end_classes)
+
+        ##### binary edges done ######
+
+        #n-hop edges, property paths of every hop combination as sparse adjacency products
+        for edge in self.plan.n_hop_edges:
+            edge_lists[f"edge_list_{edge.name}"] = index.hop_edges(edge.start_classes, edge.hops, edge.end_classes)
+
+        ##### n-hop edges done ######
+
+        return edge_lists
+
+    def save(self, tables, save_path_numeric_graph=None, save_path_mapping=None):
+        save_path_numeric_graph = save_path_numeric_graph or self.save_path_numeric_graph
+        save_path_mapping = save_path_mapping or self.save_path_mapping
+        nodes_data_pivoted_df = tables['nodes']
+
+        print(f"## Saving.. ")
+        folder_check(save_path_numeric_graph)
+        folder_check(save_path_mapping)
+
+        #save the topological node features, the npy output keeps the subjects only in the mapping files
+        for key, value in nodes_data_pivoted_df.items():
+            if self.output_format == 'csv':
+                _save_csv_tables(value, save_path_numeric_graph, key)
+            else:
+                save_table(value.drop(columns=['subject']).to_numpy(dtype=np.float32), save_path_numeric_graph, key, self.output_format, dtype=np.float32)
+
+        for key, value in nodes_data_pivoted_df.items():
+            value_copy = value[['subject']].copy()
+            value_copy['mapping'] = range(len(value_copy))
+            filename = key + ".csv"
+            file_path = os.path.join(save_path_mapping, filename)
+            value_copy.to_csv(file_path, index=False)
+
+        #save binary edges (simple edges) and n-hop edges as local ids of the node tables
+        for key, value in tables['edges'].items():
+            save_table(value.T, save_path_numeric_graph, key, self.output_format, dtype=np.int64)
+
+        print(f"## Result saved at: {save_path_mapping=} {save_path_numeric_graph}")
+
+
+def main():
+    args = _get_parser().parse_args()
+
+    print(f"## AutoRDF2GML (topology-based): START! ##")
+    start_time = time.time()
+    print(f"## {start_time=}")
+    print(f"## Loading the config file: {args.config_path}")
+    converter = TopologyConverter.from_config_path(args.config_path)
+    # config.read('use-case-aifb/config-cb.ini')
+
+    print (f'## Configs: input:{converter.file_path} / output:{converter.save_path_mapping} {converter.save_path_numeric_graph} / {converter.kge_model=}')
+
+    if args.fit_shared_embedding:
+        converter.fit_shared_embedding(args.fit_shared_embedding, shard_size=args.shard_size)
+        print("--- %.2f seconds ---" % (time.time() - start_time))
+        return
+
+    folder_check(converter.save_path_numeric_graph)
+    folder_check(converter.save_path_mapping)
+
+    tables = converter.convert()
+    converter.save(tables)
+
+    print(f"## Finished creating the graph dataset!")
+
+    ######## Automatic graph creation done ########
+    print("--- %.2f seconds ---" % (time.time() - start_time))
+    print(f"## AutoRDF2GML (topology-based): END!")
+
+
+if __name__ == "__main__":
+    main()
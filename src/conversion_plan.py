@@ -0,0 +1,271 @@
+import configparser
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from rdflib import URIRef
+
+from graph_tables import OUTPUT_FORMATS
+
+
+KGE_MODELS = ('transe', 'complex', 'distmult')
+
+
+class ConfigError(ValueError):
+    """Invalid converter config, raised when the plan is compiled."""
+
+
+@dataclass(frozen=True)
+class EdgeSpec:
+    """One configured edge between two node types.
+
+    hops holds one tuple of alternative predicates per hop; simple and n-aray
+    edges have a single hop.
+    """
+    name: str
+    start_node: str
+    end_node: str
+    start_classes: Tuple[URIRef, ...]
+    end_classes: Tuple[URIRef, ...]
+    hops: Tuple[Tuple[URIRef, ...], ...]
+    feature_path: Tuple[URIRef, ...] = ()
+    feature_values: Tuple[URIRef, ...] = ()
+
+
+@dataclass(frozen=True)
+class ContentSettings:
+    nld_class: str
+    embedding_model: str
+    embedding_batch_size: int = 32
+    embedding_num_threads: int = 0
+    embedding_cache_path: Optional[str] = None
+    embedding_cache_max_entries: int = 100000
+    correlation_block_size: Optional[int] = None
+    profile_sample_size: int = 1000
+    feature_schema_path: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class TopologySettings:
+    kge_model: str
+    class_list: Tuple[URIRef, ...]
+    pred_list: Tuple[URIRef, ...]
+    max_epochs: int = 900
+    patience: int = 0
+    min_delta: float = 0.0
+    shared_embedding_path: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ConversionPlan:
+    """Validated, immutable form of a converter config.
+
+    Compiled once with `compile_plan`; it can be pickled to worker processes and
+    shared by every conversion of a batch. content / topology are None when the
+    config has no content-based ([NLD], [EMBEDDING]) or topology-based ([MODEL],
+    [EmbeddingClasses], [EmbeddingPredicates]) sections.
+    """
+    input_path: Optional[str]
+    triple_cache_dir: Optional[str]
+    save_path_numeric_graph: Optional[str]
+    save_path_mapping: Optional[str]
+    output_format: str
+    sparse_categorical: bool
+    classes: Tuple[Tuple[str, Tuple[URIRef, ...]], ...]
+    simple_edges: Tuple[EdgeSpec, ...] = ()
+    n_aray_edges: Tuple[EdgeSpec, ...] = ()
+    n_hop_edges: Tuple[EdgeSpec, ...] = ()
+    content: Optional[ContentSettings] = None
+    topology: Optional[TopologySettings] = None
+
+    @property
+    def class_names(self):
+        return [class_name for class_name, _ in self.classes]
+
+    @property
+    def class_dict(self):
+        return {class_name: list(uris) for class_name, uris in self.classes}
+
+    @property
+    def edge_node_types(self):
+        #n-hop edges come last and win over an n-aray edge of the same name
+        return {edge.name: (edge.start_node, edge.end_node) for edge in self.simple_edges + self.n_aray_edges + self.n_hop_edges}
+
+    @classmethod
+    def from_config_path(cls, config_path, content=None, topology=None):
+        config = configparser.ConfigParser()
+        if not config.read(config_path):
+            raise ConfigError(f"Config file not found: {config_path}")
+        return compile_plan(config, content=content, topology=topology)
+
+
+class _Compiler:
+    #reads the config and collects every problem instead of stopping at the first one
+
+    def __init__(self, config):
+        self.config = config
+        self.errors = []
+
+    def get(self, section, option, fallback=None, required=True):
+        if self.config.has_option(section, option):
+            value = self.config.get(section, option).strip()
+            if value:
+                return value
+        if required:
+            self.errors.append(f"[{section}] {option} is missing")
+        return fallback
+
+    def getbool(self, section, option, fallback):
+        value = self.get(section, option, required=False)
+        if value is None:
+            return fallback
+        if value.lower() not in self.config.BOOLEAN_STATES:
+            self.errors.append(f"[{section}] {option} = {value!r} is not a boolean")
+            return fallback
+        return self.config.BOOLEAN_STATES[value.lower()]
+
+    def getint(self, section, option, fallback, minimum=0):
+        value = self.get(section, option, required=False)
+        if value is None:
+            return fallback
+        try:
+            value = int(value)
+        except ValueError:
+            self.errors.append(f"[{section}] {option} = {value!r} is not an integer")
+            return fallback
+        if value < minimum:
+            self.errors.append(f"[{section}] {option} = {value} must be >= {minimum}")
+        return value
+
+    def getfloat(self, section, option, fallback, minimum=0.0):
+        value = self.get(section, option, required=False)
+        if value is None:
+            return fallback
+        try:
+            value = float(value)
+        except ValueError:
+            self.errors.append(f"[{section}] {option} = {value!r} is not a number")
+            return fallback
+        if value < minimum:
+            self.errors.append(f"[{section}] {option} = {value} must be >= {minimum}")
+        return value
+
+    def names(self, section, option, required=True):
+        value = self.get(section, option, required=required)
+        return [name.strip() for name in value.split(',') if name.strip()] if value else []
+
+    def uris(self, section, option, minimum=1):
+        uris = []
+        for uri in self.names(section, option):
+            if ':' not in uri or any(char.isspace() or char in '<>"' for char in uri):
+                self.errors.append(f"[{section}] {option}: {uri!r} is not an IRI")
+            uris.append(URIRef(uri))
+        if len(uris) < minimum and self.config.has_option(section, option):
+            self.errors.append(f"[{section}] {option} needs at least {minimum} IRI(s)")
+        return tuple(uris)
+
+    def node(self, section, option, classes):
+        class_name = self.get(section, option)
+        if class_name is not None and class_name not in classes:
+            self.errors.append(f"[{section}] {option} = {class_name!r} is not a class of [Nodes]")
+        return class_name
+
+    def edge(self, section, edge_name, classes, hop_options):
+        start_node = self.node(section, f'{edge_name}_start_node', classes)
+        end_node = self.node(section, f'{edge_name}_end_node', classes)
+        hops = tuple(self.uris(section, option) for option in hop_options)
+        if not hops:
+            self.errors.append(f"[{section}] {edge_name} has no hop properties")
+        return dict(name=edge_name, start_node=start_node, end_node=end_node,
+                    start_classes=classes.get(start_node, ()), end_classes=classes.get(end_node, ()), hops=hops)
+
+
+def compile_plan(config, content=None, topology=None):
+    """Validate a parsed config and compile it into a ConversionPlan.
+
+    content / topology: True requires the sections of that converter, False skips
+    them and None compiles them when present. All problems are reported in one
+    ConfigError.
+    """
+    compiler = _Compiler(config)
+    with_content = content or (content is None and config.has_section('NLD'))
+    with_topology = topology or (topology is None and config.has_section('MODEL'))
+
+    output_format = compiler.get('SavePath', 'output_format', fallback='csv', required=False)
+    if output_format not in OUTPUT_FORMATS:
+        compiler.errors.append(f"[SavePath] output_format = {output_format!r}, expected one of {OUTPUT_FORMATS}")
+    sparse_categorical = compiler.getbool('SavePath', 'sparse_categorical', False)
+    if sparse_categorical and output_format != 'npy':
+        compiler.errors.append("[SavePath] sparse_categorical needs output_format = npy")
+
+    classes = {}
+    for class_name in compiler.names('Nodes', 'classes'):
+        classes[class_name] = compiler.uris('Nodes', class_name)
+
+    simple_edges = []
+    for edge_name in compiler.names('SimpleEdges', 'edge_names'):
+        simple_edges.append(EdgeSpec(**compiler.edge('SimpleEdges', edge_name, classes, [f'{edge_name}_properties'])))
+
+    n_aray_edges = []
+    for edge_name in compiler.names('N-ArayEdges', 'edge_names', required=False):
+        edge = compiler.edge('N-ArayEdges', edge_name, classes, [f'{edge_name}_properties'])
+        if with_content:
+            #only the content-based converter reads the edge features
+            edge['feature_path'] = compiler.uris('N-ArayFeaturePath', f'{edge_name}_feature_path', minimum=2)
+            edge['feature_values'] = compiler.uris('N-ArayFeatureValue', f'{edge_name}_feature_value')
+        n_aray_edges.append(EdgeSpec(**edge))
+
+    n_hop_edges = []
+    for edge_name in compiler.names('N-HopEdges', 'edge_names', required=False):
+        hop_options = []
+        while config.has_option('N-HopEdges', f'{edge_name}_hop{len(hop_options) + 1}_properties'):
+            hop_options.append(f'{edge_name}_hop{len(hop_options) + 1}_properties')
+        n_hop_edges.append(EdgeSpec(**compiler.edge('N-HopEdges', edge_name, classes, hop_options)))
+
+    content_settings = None
+    if with_content:
+        nld_class = compiler.get('NLD', 'nld_class')
+        if nld_class is not None and nld_class not in classes:
+            compiler.errors.append(f"[NLD] nld_class = {nld_class!r} is not a class of [Nodes]")
+        content_settings = ContentSettings(
+            nld_class=nld_class,
+            embedding_model=compiler.get('EMBEDDING', 'embedding_model'),
+            embedding_batch_size=compiler.getint('EMBEDDING', 'batch_size', 32, minimum=1),
+            embedding_num_threads=compiler.getint('EMBEDDING', 'num_threads', 0),
+            embedding_cache_path=compiler.get('EMBEDDING', 'cache_path', required=False),
+            embedding_cache_max_entries=compiler.getint('EMBEDDING', 'cache_max_entries', 100000, minimum=1),
+            correlation_block_size=compiler.getint('FeatureSelection', 'correlation_block_size', 0) or None,
+            profile_sample_size=compiler.getint('FeatureSelection', 'profile_sample_size', 1000, minimum=1),
+            feature_schema_path=compiler.get('FeatureSelection', 'schema_path', required=False),
+        )
+
+    topology_settings = None
+    if with_topology:
+        kge_model = compiler.get('MODEL', 'kge_model')
+        if kge_model is not None and kge_model not in KGE_MODELS:
+            compiler.errors.append(f"[MODEL] kge_model = {kge_model!r}, expected one of {KGE_MODELS}")
+        topology_settings = TopologySettings(
+            kge_model=kge_model,
+            class_list=compiler.uris('EmbeddingClasses', 'class_list'),
+            pred_list=compiler.uris('EmbeddingPredicates', 'pred_list'),
+            max_epochs=compiler.getint('MODEL', 'max_epochs', 900, minimum=1),
+            patience=compiler.getint('MODEL', 'patience', 0),
+            min_delta=compiler.getfloat('MODEL', 'min_delta', 0.0),
+            shared_embedding_path=compiler.get('MODEL', 'shared_embedding', required=False),
+        )
+
+    if compiler.errors:
+        raise ConfigError("Invalid config:\n  " + "\n  ".join(compiler.errors))
+
+    return ConversionPlan(
+        input_path=compiler.get('InputPath', 'input_path', required=False),
+        triple_cache_dir=compiler.get('InputPath', 'triple_cache_dir', required=False),
+        save_path_numeric_graph=compiler.get('SavePath', 'save_path_numeric_graph', required=False),
+        save_path_mapping=compiler.get('SavePath', 'save_path_mapping', required=False),
+        output_format=output_format,
+        sparse_categorical=sparse_categorical,
+        classes=tuple(classes.items()),
+        simple_edges=tuple(simple_edges),
+        n_aray_edges=tuple(n_aray_edges),
+        n_hop_edges=tuple(n_hop_edges),
+        content=content_settings,
+        topology=topology_settings,
+    )
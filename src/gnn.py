@@ -7,17 +7,21 @@ import pandas as pd
 import numpy as np
 import torch
 from torch import Tensor
-import subprocess
-import tempfile
+import configparser
+import shutil
 from rdflib.query import ResultRow
 from sklearn.preprocessing import StandardScaler
 from torch_geometric.loader import DataLoader
+from torch.utils.data import SubsetRandomSampler
 import random
 import torch.nn.functional as F
 from torch_geometric.nn import HeteroConv, Linear, SAGEConv, GCNConv, GATConv, global_mean_pool
 import sys 
 from tqdm import tqdm
-python_executable = sys.executable
+from autordf2gml_combined import CombinedConverter
+from conversion_plan import compile_plan
+from graph_dataset import ShardedGraphDataset, ShardShuffleSampler
+from graph_tables import load_table
 
 current_dir = os.path.abspath('')
 data_path = os.path.join(current_dir, '..', 'data')
@@ -30,6 +34,8 @@ nt_path = os.path.join(current_dir, '..', 'nt_data')
 scripts_path = os.path.join(current_dir, 'scripts')
 model_data_path = os.path.join(data_path, 'processed_data', 'replicated_models')
 model_output_path = os.path.join('..', 'model_outputs')
+triple_cache_path = os.path.join(current_dir, '..', 'triple_cache')
+graph_dataset_path = os.path.join(current_dir, '..', 'graph_dataset')
 
 
 
@@ -66,192 +72,178 @@ def convert_all_xml_to_nt_and_get_y_measures():
         y_measures.append(y)
     return y_measures
 
+def csr_to_sparse_tensor(matrix):
+    coo = matrix.tocoo()
+    indices = torch.from_numpy(np.vstack([coo.row, coo.col]).astype(np.int64))
+    return torch.sparse_coo_tensor(indices, torch.from_numpy(coo.data.astype(np.float32)), coo.shape).coalesce()
+
+def node_features(batch):
+    #dense model input: numeric, embedding and topology block plus the densified one-hot block
+    x_dict = batch.x_dict
+    for node_type in batch.node_types:
+        if 'x_categorical' in batch[node_type]:
+            x_dict[node_type] = torch.cat([x_dict[node_type], batch[node_type].x_categorical.to_dense()], dim=1)
+    return x_dict
+
+#one config for both feature blocks, the graphs are converted in memory and nothing is saved
+graph_config_string = f'''
+[InputPath]
+triple_cache_dir = {triple_cache_path}
+
+[SavePath]
+output_format = npy
+sparse_categorical = true
+
+[NLD]
+nld_class = ModuleDefinition
+
+[EMBEDDING]
+embedding_model = allenai/scibert_scivocab_uncased
+
+[Nodes]
+classes = ComponentDefinition, Sequence, ModuleDefinition, Module, FunctionalComponent, Component, SequenceAnnotation, Range
+
+ComponentDefinition = http://sbols.org/v2#ComponentDefinition
+Sequence = http://sbols.org/v2#Sequence
+ModuleDefinition = http://sbols.org/v2#ModuleDefinition
+Module = http://sbols.org/v2#Module
+FunctionalComponent = http://sbols.org/v2#FunctionalComponent
+Component = http://sbols.org/v2#Component
+SequenceAnnotation = http://sbols.org/v2#SequenceAnnotation
+Range = http://sbols.org/v2#Range
+
+[SimpleEdges]
+edge_names = ComponentDefinition_Sequence, ComponentDefinition_SequenceAnnotation
+ComponentDefinition_Sequence_start_node = ComponentDefinition
+ComponentDefinition_Sequence_properties = http://sbols.org/v2#sequence
+ComponentDefinition_Sequence_end_node = Sequence
+ComponentDefinition_SequenceAnnotation_start_node = ComponentDefinition
+ComponentDefinition_SequenceAnnotation_properties = http://sbols.org/v2#sequenceAnnotation
+ComponentDefinition_SequenceAnnotation_end_node = SequenceAnnotation
+
+[N-HopEdges]
+edge_names = ComponentDefinition_Range, ModuleDefinition_ComponentDefinition, ModuleDefinition_ModuleDefinition, ComponentDefinition_ComponentDefinition
+ComponentDefinition_Range_start_node = ComponentDefinition
+ComponentDefinition_Range_hop1_properties = http://sbols.org/v2#sequenceAnnotation
+ComponentDefinition_Range_hop2_properties = http://sbols.org/v2#location
+ComponentDefinition_Range_end_node = Range
+ModuleDefinition_ComponentDefinition_start_node = ModuleDefinition
+ModuleDefinition_ComponentDefinition_hop1_properties = http://sbols.org/v2#functionalComponent
+ModuleDefinition_ComponentDefinition_hop2_properties = http://sbols.org/v2#definition
+ModuleDefinition_ComponentDefinition_end_node = ComponentDefinition
+ModuleDefinition_ModuleDefinition_start_node = ModuleDefinition
+ModuleDefinition_ModuleDefinition_hop1_properties = http://sbols.org/v2#module
+ModuleDefinition_ModuleDefinition_hop2_properties = http://sbols.org/v2#definition
+ModuleDefinition_ModuleDefinition_end_node = ModuleDefinition
+ComponentDefinition_ComponentDefinition_start_node = ComponentDefinition
+ComponentDefinition_ComponentDefinition_hop1_properties = http://sbols.org/v2#component
+ComponentDefinition_ComponentDefinition_hop2_properties = http://sbols.org/v2#definition
+ComponentDefinition_ComponentDefinition_end_node = ComponentDefinition
+
+[N-ArayEdges]
+edge_names = ComponentDefinition_Range
+ComponentDefinition_Range_start_node = ComponentDefinition
+ComponentDefinition_Range_properties = http://sbols.org/v2#sequenceAnnotation, http://sbols.org/v2#location
+ComponentDefinition_Range_end_node = Range
+
+[N-ArayFeaturePath]
+ComponentDefinition_Range_feature_path = http://sbols.org/v2#sequenceAnnotation, http://sbols.org/v2#location
+
+[N-ArayFeatureValue]
+ComponentDefinition_Range_feature_value = http://sbols.org/v2#start, http://sbols.org/v2#end
+
+[MODEL] ;required, options = transe / complex / distmult; early stopping is off unless patience > 0 is set, see top-config.ini
+;every design gets its own KGE model, see return_all_graphs(union_training=...) for training several designs together
+kge_model = distmult
+max_epochs = 900
+
+[EmbeddingClasses]
+class_list = http://sbols.org/v2#ComponentDefinition, http://sbols.org/v2#Sequence, http://sbols.org/v2#ModuleDefinition, http://sbols.org/v2#Module, http://sbols.org/v2#FunctionalComponent, http://sbols.org/v2#Component, http://sbols.org/v2#SequenceAnnotation, http://sbols.org/v2#Range
+
+[EmbeddingPredicates]
+pred_list = http://sbols.org/v2#location, http://sbols.org/v2#sequenceAnnotation, http://sbols.org/v2#functionalComponent, http://sbols.org/v2#definition, http://sbols.org/v2#module, http://sbols.org/v2#component, https://sbols.org/v2#sequence, http://www.w3.org/1999/02/22-rdf-syntax-ns#type
+'''
+
+_graph_converter = None
+
+def compile_graph_plan():
+    config = configparser.ConfigParser()
+    config.read_string(graph_config_string)
+    return compile_plan(config, content=True, topology=True)
+
+def get_graph_converter(plan=None):
+    #built once per process; the plan, embedding model and caches are reused by every design
+    global _graph_converter
+    if _graph_converter is None:
+        _graph_converter = CombinedConverter(plan or compile_graph_plan())
+    return _graph_converter
+
 def return_heterograph_for_one_nt(nt_file_name, node_names, edge_names):
-    
-    with tempfile.TemporaryDirectory() as temp_dir:
-        save_path_numeric = os.path.join(temp_dir, "save_path_numeric")
-        path = os.path.join(temp_dir, "path")
-        os.makedirs(save_path_numeric, exist_ok=True)
-        os.makedirs(path, exist_ok=True)
-
-        content_config_string = f'''
-        [InputPath]
-        input_path = {os.path.join(nt_path, nt_file_name)}
-
-        [SavePath]
-        save_path_numeric_graph = {save_path_numeric}
-        save_path_mapping = {path}
-
-        [NLD]
-        nld_class = ModuleDefinition
-
-        [EMBEDDING]
-        embedding_model = allenai/scibert_scivocab_uncased
-
-        [Nodes]
-        classes = ComponentDefinition, Sequence, ModuleDefinition, Module, FunctionalComponent, Component, SequenceAnnotation, Range
-
-        ComponentDefinition = http://sbols.org/v2#ComponentDefinition
-        Sequence = http://sbols.org/v2#Sequence
-        ModuleDefinition = http://sbols.org/v2#ModuleDefinition
-        Module = http://sbols.org/v2#Module
-        FunctionalComponent = http://sbols.org/v2#FunctionalComponent
-        Component = http://sbols.org/v2#Component
-        SequenceAnnotation = http://sbols.org/v2#SequenceAnnotation
-        Range = http://sbols.org/v2#Range
-
-        [SimpleEdges]
-        edge_names = ComponentDefinition_Sequence, ComponentDefinition_SequenceAnnotation
-        ComponentDefinition_Sequence_start_node = ComponentDefinition
-        ComponentDefinition_Sequence_properties = http://sbols.org/v2#sequence
-        ComponentDefinition_Sequence_end_node = Sequence
-        ComponentDefinition_SequenceAnnotation_start_node = ComponentDefinition
-        ComponentDefinition_SequenceAnnotation_properties = http://sbols.org/v2#sequenceAnnotation
-        ComponentDefinition_SequenceAnnotation_end_node = SequenceAnnotation
-
-        [N-HopEdges]
-        edge_names = ComponentDefinition_Range, ModuleDefinition_ComponentDefinition, ModuleDefinition_ModuleDefinition, ComponentDefinition_ComponentDefinition
-        ComponentDefinition_Range_start_node = ComponentDefinition
-        ComponentDefinition_Range_hop1_properties = http://sbols.org/v2#sequenceAnnotation
-        ComponentDefinition_Range_hop2_properties = http://sbols.org/v2#location
-        ComponentDefinition_Range_end_node = Range
-        ModuleDefinition_ComponentDefinition_start_node = ModuleDefinition
-        ModuleDefinition_ComponentDefinition_hop1_properties = http://sbols.org/v2#functionalComponent
-        ModuleDefinition_ComponentDefinition_hop2_properties = http://sbols.org/v2#definition
-        ModuleDefinition_ComponentDefinition_end_node = ComponentDefinition
-        ModuleDefinition_ModuleDefinition_start_node = ModuleDefinition
-        ModuleDefinition_ModuleDefinition_hop1_properties = http://sbols.org/v2#module
-        ModuleDefinition_ModuleDefinition_hop2_properties = http://sbols.org/v2#definition
-        ModuleDefinition_ModuleDefinition_end_node = ModuleDefinition
-        ComponentDefinition_ComponentDefinition_start_node = ComponentDefinition
-        ComponentDefinition_ComponentDefinition_hop1_properties = http://sbols.org/v2#component
-        ComponentDefinition_ComponentDefinition_hop2_properties = http://sbols.org/v2#definition
-        ComponentDefinition_ComponentDefinition_end_node = ComponentDefinition
-
-        [N-ArayEdges]
-        edge_names = ComponentDefinition_Range
-        ComponentDefinition_Range_start_node = ComponentDefinition
-        ComponentDefinition_Range_properties = http://sbols.org/v2#sequenceAnnotation, http://sbols.org/v2#location
-        ComponentDefinition_Range_end_node = Range
-
-        [N-ArayFeaturePath]
-        ComponentDefinition_Range_feature_path = http://sbols.org/v2#sequenceAnnotation, http://sbols.org/v2#location
-
-        [N-ArayFeatureValue]
-        ComponentDefinition_Range_feature_value = http://sbols.org/v2#start, http://sbols.org/v2#end
-        '''
-
-        topo_config_string = f'''
-        [InputPath]
-        input_path = {os.path.join(nt_path, nt_file_name)}
-
-        [SavePath]
-        save_path_numeric_graph = {save_path_numeric}
-        save_path_mapping = {path}
-
-        [MODEL] ;required, options = transe / complex / distmult / rotate
-        kge_model = distmult
-
-        [Nodes]
-        classes = ComponentDefinition, Sequence, ModuleDefinition, Module, FunctionalComponent, Component, SequenceAnnotation, Range
-
-        ComponentDefinition = http://sbols.org/v2#ComponentDefinition
-        Sequence = http://sbols.org/v2#Sequence
-        ModuleDefinition = http://sbols.org/v2#ModuleDefinition
-        Module = http://sbols.org/v2#Module
-        FunctionalComponent = http://sbols.org/v2#FunctionalComponent
-        Component = http://sbols.org/v2#Component
-        SequenceAnnotation = http://sbols.org/v2#SequenceAnnotation
-        Range = http://sbols.org/v2#Range
-
-        [SimpleEdges]
-        edge_names = ComponentDefinition_Sequence, ComponentDefinition_SequenceAnnotation
-        ComponentDefinition_Sequence_start_node = ComponentDefinition
-        ComponentDefinition_Sequence_properties = http://sbols.org/v2#sequence
-        ComponentDefinition_Sequence_end_node = Sequence
-        ComponentDefinition_SequenceAnnotation_start_node = ComponentDefinition
-        ComponentDefinition_SequenceAnnotation_properties = http://sbols.org/v2#sequenceAnnotation
-        ComponentDefinition_SequenceAnnotation_end_node = SequenceAnnotation
-
-        [N-HopEdges]
-        edge_names = ComponentDefinition_Range, ModuleDefinition_ComponentDefinition, ModuleDefinition_ModuleDefinition, ComponentDefinition_ComponentDefinition
-        ComponentDefinition_Range_start_node = ComponentDefinition
-        ComponentDefinition_Range_hop1_properties = http://sbols.org/v2#sequenceAnnotation
-        ComponentDefinition_Range_hop2_properties = http://sbols.org/v2#location
-        ComponentDefinition_Range_end_node = Range
-        ModuleDefinition_ComponentDefinition_start_node = ModuleDefinition
-        ModuleDefinition_ComponentDefinition_hop1_properties = http://sbols.org/v2#functionalComponent
-        ModuleDefinition_ComponentDefinition_hop2_properties = http://sbols.org/v2#definition
-        ModuleDefinition_ComponentDefinition_end_node = ComponentDefinition
-        ModuleDefinition_ModuleDefinition_start_node = ModuleDefinition
-        ModuleDefinition_ModuleDefinition_hop1_properties = http://sbols.org/v2#module
-        ModuleDefinition_ModuleDefinition_hop2_properties = http://sbols.org/v2#definition
-        ModuleDefinition_ModuleDefinition_end_node = ModuleDefinition
-        ComponentDefinition_ComponentDefinition_start_node = ComponentDefinition
-        ComponentDefinition_ComponentDefinition_hop1_properties = http://sbols.org/v2#component
-        ComponentDefinition_ComponentDefinition_hop2_properties = http://sbols.org/v2#definition
-        ComponentDefinition_ComponentDefinition_end_node = ComponentDefinition
-
-        [N-ArayEdges]
-        edge_names = ComponentDefinition_Range
-        ComponentDefinition_Range_start_node = ComponentDefinition
-        ComponentDefinition_Range_properties = http://sbols.org/v2#sequenceAnnotation, http://sbols.org/v2#location
-        ComponentDefinition_Range_end_node = Range
-
-        [EmbeddingClasses] 
-        class_list = http://sbols.org/v2#ComponentDefinition, http://sbols.org/v2#Sequence, http://sbols.org/v2#ModuleDefinition, http://sbols.org/v2#Module, http://sbols.org/v2#FunctionalComponent, http://sbols.org/v2#Component, http://sbols.org/v2#SequenceAnnotation, http://sbols.org/v2#Range
-
-        [EmbeddingPredicates] 
-        pred_list = http://sbols.org/v2#location, http://sbols.org/v2#sequenceAnnotation, http://sbols.org/v2#functionalComponent, http://sbols.org/v2#definition, http://sbols.org/v2#module, http://sbols.org/v2#component, https://sbols.org/v2#sequence, http://www.w3.org/1999/02/22-rdf-syntax-ns#type
-        '''
-
-        with open(os.path.join(temp_dir,'config.ini'), 'w') as file:
-            file.write(content_config_string)
-
-        with open(os.path.join(temp_dir,'topo-config.ini'), 'w') as file:
-            file.write(topo_config_string)
-
-        content_result = subprocess.run([python_executable, "autordf2gml.py", "--config_path", os.path.join(temp_dir,"config.ini")], shell=False, capture_output=True, text=True)
-        topo_result = subprocess.run([python_executable, "autordf2gml-tb.py", "--config_path", os.path.join(temp_dir,"topo-config.ini")], shell=False, capture_output=True, text=True, encoding='utf-8', errors='replace')
-
-        if (topo_result.returncode != 0):
-            print(f"topology-based conversion failed with return code {topo_result.returncode}.")
-
-        
-        data = HeteroData()
-        local_indices_map = {}            
-
-        for node_name in node_names:
-            node_features_df = pd.read_csv(os.path.join(save_path_numeric, f'pivoted_df_{node_name}.csv'), header=None).astype(float)
-            node_tensor = torch.tensor(node_features_df.values, dtype=torch.float)
-            id_mapping_df = pd.read_csv(os.path.join(path, f'pivoted_df_{node_name}.csv'))
-            subject_mapping_dict = id_mapping_df.set_index('subject')['mapping'].to_dict()
-
-            topo_df = pd.read_csv(os.path.join(save_path_numeric, f"uri_list_{node_name}.csv"))
-            topo_df['mapped_col'] = topo_df['subject'].map(subject_mapping_dict)
-            topo_df = topo_df.sort_values(by='mapped_col')
-            topo_df = topo_df.drop(['subject', 'mapped_col'], axis=1).astype(float)
-            node_tensor_topo = torch.tensor(topo_df.values, dtype=torch.float)
-
-
-            node_tensor = torch.concat([node_tensor, node_tensor_topo], dim=1)
-            
-            data[node_name].node_id = torch.arange(len(id_mapping_df))
-            data[node_name].x = node_tensor
-            local_indices_map = subject_mapping_dict | local_indices_map
-                
-        for edge in edge_names:
-            df = pd.read_csv( os.path.join(save_path_numeric, f"edge_list_{edge}.csv"), header=None)
-            
-            src = df[0].values
-            dst = df[1].values
-
-            src = torch.tensor([local_indices_map[src[i]] for i in range(len(src))], dtype=torch.long)
-            dst = torch.tensor([local_indices_map[dst[i]] for i in range(len(dst))], dtype=torch.long)
-            data[edge.split("_")[0], f'has_{edge.split("_")[1]}', edge.split("_")[1]].edge_index = torch.stack([src, dst], dim=0)
-        
-        return data
-    
+
+    #one parse for both feature blocks, the topology features come in the content-based node order
+    converter = get_graph_converter()
+    tables = converter.convert(os.path.join(nt_path, nt_file_name))
+    return heterograph_from_tables(converter, tables, node_names, edge_names)
+
+def heterograph_from_tables(converter, tables, node_names, edge_names):
+
+    data = HeteroData()
+
+    for node_name in node_names:
+        node_table = tables['nodes'][f'pivoted_df_{node_name}']
+        node_features, categorical = converter.content.numeric_features(node_table)
+        node_tensor = torch.tensor(np.asarray(node_features, dtype=np.float32))
+
+        topo_features = tables['topology'][f'pivoted_df_topology_{node_name}']
+        node_tensor_topo = torch.from_numpy(topo_features)
+
+        node_tensor = torch.concat([node_tensor, node_tensor_topo], dim=1)
+
+        #row i of every node table is the entity node_table['subject'][i]
+        data[node_name].node_id = torch.arange(len(node_table))
+        data[node_name].x = node_tensor
+
+        #one-hot columns stay sparse until a batch is fed to the model
+        if categorical is not None:
+            data[node_name].x_categorical = csr_to_sparse_tensor(categorical)
+
+    for edge in edge_names:
+        #already (2, num_edges) int64 local ids of the node tables
+        edge_index = torch.tensor(tables['edges'][f"edge_list_{edge}"], dtype=torch.long)
+        data[edge.split("_")[0], f'has_{edge.split("_")[1]}', edge.split("_")[1]].edge_index = edge_index
+
+    return data
+
+def heterograph_from_saved_tables(save_path_numeric_graph, node_names, edge_names):
+    """heterograph_from_tables for the tables a converter CLI run saved under
+    save_path_numeric_graph; npy tables are memory-mapped, only the rows of the
+    feature blocks are copied into the tensors. The topology block is appended
+    when the folder has one (autordf2gml_combined.py output).
+    """
+    data = HeteroData()
+
+    for node_name in node_names:
+        blocks = [load_table(save_path_numeric_graph, f'pivoted_df_{node_name}')]
+        topo_features = load_table(save_path_numeric_graph, f'pivoted_df_topology_{node_name}')
+        if topo_features is not None:
+            blocks.append(topo_features)
+        node_tensor = torch.from_numpy(np.concatenate(blocks, axis=1, dtype=np.float32))
+
+        data[node_name].node_id = torch.arange(len(node_tensor))
+        data[node_name].x = node_tensor
+
+        categorical = load_table(save_path_numeric_graph, f'pivoted_df_{node_name}_categorical')
+        if categorical is not None:
+            data[node_name].x_categorical = csr_to_sparse_tensor(categorical)
+
+    for edge in edge_names:
+        #saved as (num_edges, 2) local ids of the node tables
+        edge_list = load_table(save_path_numeric_graph, f"edge_list_{edge}")
+        edge_index = torch.tensor(np.asarray(edge_list, dtype=np.int64).T)
+        data[edge.split("_")[0], f'has_{edge.split("_")[1]}', edge.split("_")[1]].edge_index = edge_index
+
+    return data
+
 class HeteroGNN_GraphLevel(torch.nn.Module):
     def __init__(self, metadata, hidden_channels, num_layers):
         super().__init__()
@@ -319,42 +311,88 @@ class HeteroGNN_GraphLevel(torch.nn.Module):
     
 #     return all_data
     
-import concurrent.futures
-
-def process_one(args):
-    i, filename, node_classes, all_edges_formatted, y_measures = args
-    data = return_heterograph_for_one_nt(filename, node_classes, all_edges_formatted)
-    data.y = y_measures[i]
-    return data
-
-def return_all_graphs(node_classes, y_measures, all_edges_formatted):
+import multiprocessing
+
+_worker_node_classes = None
+_worker_edges = None
+_worker_union_training = False
+
+def init_graph_worker(plan, node_classes, all_edges_formatted, intra_op_threads, union_training=False):
+    #runs once per worker: thread budget, class and edge lists, then the converter of the
+    #parent's compiled plan, its embedding model and caches
+    global _worker_node_classes, _worker_edges, _worker_union_training
+    torch.set_num_threads(intra_op_threads)
+    _worker_node_classes = node_classes
+    _worker_edges = all_edges_formatted
+    _worker_union_training = union_training
+    get_graph_converter(plan).content.embedder
+
+def process_batch(tasks):
+    converter = get_graph_converter()
+    paths = [os.path.join(nt_path, filename) for _, filename in tasks]
+    if _worker_union_training:
+        #the KG embeddings of the designs of one task are trained together in one disjoint-union model
+        all_tables = converter.convert_many(paths)
+    else:
+        all_tables = [converter.convert(path) for path in paths]
+    return [(i, heterograph_from_tables(converter, tables, _worker_node_classes, _worker_edges)) for (i, _), tables in zip(tasks, all_tables)]
+
+def return_all_graphs(node_classes, y_measures, all_edges_formatted, max_workers=None, intra_op_threads=1, chunksize=4, union_training=False):
+    """Convert every design of nt_path in a pool of preloaded workers, yielding
+    the graphs in os.listdir order.
+
+    Tasks only carry chunksize (index, filename) pairs, each design is converted
+    on its own with CombinedConverter.convert; graphs come back as they finish
+    and only those ahead of the next id to yield are held in memory. max_workers * intra_op_threads
+    is kept within the cpu count so the workers' torch threads do not
+    oversubscribe the cores.
+
+    union_training=True converts the designs of a task together with
+    CombinedConverter.convert_many instead, one disjoint-union KGE model per
+    task. That is faster, but a design's topology features then depend on
+    which designs share its task, i.e. on chunksize and the listdir order, so
+    they are not reproducible across those settings.
+    """
     files = os.listdir(nt_path)
+    tasks = list(enumerate(files))
+    batches = [tasks[start:start + chunksize] for start in range(0, len(tasks), chunksize)]
 
-    tasks = [
-        (i, filename, node_classes, all_edges_formatted, y_measures)
-        for i, filename in enumerate(files)
-    ]
+    cpu_count = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers or cpu_count, cpu_count // intra_op_threads, len(files) or 1))
+    print(f"Generating graphs with {max_workers} workers x {intra_op_threads} threads")
 
-    with concurrent.futures.ProcessPoolExecutor() as executor:
-        all_data = list(tqdm(
-            executor.map(process_one, tasks),
-            total=len(files),
-            desc="Generating graphs"
-        ))
+    #the config is parsed and validated once here, the workers get the compiled plan
+    plan = compile_graph_plan()
 
-    return all_data
+    pending = {}
+    next_id = 0
+    with multiprocessing.Pool(max_workers, initializer=init_graph_worker, initargs=(plan, node_classes, all_edges_formatted, intra_op_threads, union_training)) as pool:
+        progress = tqdm(total=len(files), desc="Generating graphs")
+        for results in pool.imap_unordered(process_batch, batches):
+            for i, data in results:
+                data.y = y_measures[i]
+                pending[i] = data
+            progress.update(len(results))
+            while next_id in pending:
+                yield pending.pop(next_id)
+                next_id += 1
+        progress.close()
 
 
 
 def train_GNN(all_data):
 
-    random.shuffle(all_data)
-    train_size = int(0.8 * len(all_data))
-    train_data = all_data[:train_size]
-    val_data = all_data[train_size:]
+    #all_data is a ShardedGraphDataset or a list of graphs, split by id
+    ids = list(range(len(all_data)))
+    random.shuffle(ids)
+    train_size = int(0.8 * len(ids))
+    train_ids = ids[:train_size]
+    val_ids = sorted(ids[train_size:])
 
-    train_loader = DataLoader(train_data, batch_size=10, shuffle=True)
-    val_loader = DataLoader(val_data, batch_size=10, shuffle=False) 
+    #shuffled within and across shards, every shard is read once per epoch
+    train_sampler = ShardShuffleSampler(all_data, train_ids) if isinstance(all_data, ShardedGraphDataset) else SubsetRandomSampler(train_ids)
+    train_loader = DataLoader(all_data, batch_size=10, sampler=train_sampler)
+    val_loader = DataLoader(all_data, batch_size=10, sampler=val_ids)
 
     model = HeteroGNN_GraphLevel(metadata=all_data[0].metadata(), hidden_channels=64, num_layers=2)
     optimizer = torch.optim.Adam(model.parameters(), lr=0.00001, weight_decay=1e-4)
@@ -369,7 +407,7 @@ def train_GNN(all_data):
         for batch in train_loader:
             batch = batch.to(device)
             optimizer.zero_grad()
-            out = model(batch.x_dict, batch.edge_index_dict, batch.batch_dict)
+            out = model(node_features(batch), batch.edge_index_dict, batch.batch_dict)
             target = torch.tensor(batch.y, dtype=torch.float32).view(-1)
             loss = F.mse_loss(out, target)
             loss.backward()
@@ -382,12 +420,12 @@ def train_GNN(all_data):
         with torch.no_grad(): 
             for batch in val_loader:
                 batch = batch.to(device)
-                out = model(batch.x_dict, batch.edge_index_dict, batch.batch_dict)
+                out = model(node_features(batch), batch.edge_index_dict, batch.batch_dict)
                 target = torch.tensor(batch.y, dtype=torch.float32).view(-1)
                 loss = F.mse_loss(out, target)
                 total_val_loss += loss.item() * batch.num_graphs
 
-        print(f"Epoch {epoch:03d} | Train Loss: {total_train_loss / len(train_loader.dataset):.4f} | Val Loss: {total_val_loss / len(val_loader.dataset):.4f}")
+        print(f"Epoch {epoch:03d} | Train Loss: {total_train_loss / len(train_ids):.4f} | Val Loss: {total_val_loss / len(val_ids):.4f}")
 
 node_classes = [
     "ComponentDefinition",
@@ -423,9 +461,16 @@ if __name__ == "__main__":
 
     y = return_standardized_labels(y_measures)
 
-    # Generate graphs
-    all_graphs = return_all_graphs(node_classes, y, all_edges_formatted)
-
-    # Save to pickle
-    with open("graphs_data.pkl", "wb") as f:
-        pickle.dump(all_graphs, f)
\ No newline at end of file
+    # Generate graphs, streamed into the sharded dataset one shard at a time;
+    # a rerun replaces it like the old graphs_data.pkl, later designs can be
+    # added with ShardedGraphDataset(graph_dataset_path).append
+    new_path, old_path = graph_dataset_path + '.tmp', graph_dataset_path + '.old'
+    shutil.rmtree(new_path, ignore_errors=True)
+    ShardedGraphDataset(new_path).append(return_all_graphs(node_classes, y, all_edges_formatted))
+
+    # swapped in only once complete, a failed run leaves the previous dataset in place
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(graph_dataset_path):
+        os.replace(graph_dataset_path, old_path)
+    os.replace(new_path, graph_dataset_path)
+    shutil.rmtree(old_path, ignore_errors=True)
\ No newline at end of file
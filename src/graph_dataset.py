@@ -0,0 +1,115 @@
+import json
+import os
+from collections import OrderedDict
+from itertools import islice
+
+import numpy as np
+import torch
+from torch.utils.data import Sampler
+from torch_geometric.data import Dataset
+
+
+INDEX_NAME = 'index.json'
+
+
+class ShardedGraphDataset(Dataset):
+    """HeteroData graphs stored on disk in fixed-size shards, loaded lazily by id.
+
+    Every shard is a torch.save'd list of at most shard_size graphs, listed in
+    index.json in id order. `append` only writes new shards and the index, the
+    existing shards are never rewritten, so shard sizes vary: the last shard of
+    every append can be partial and ids are located through the per-shard counts
+    of the index. `get` loads the shard holding a graph and keeps the
+    cache_shards most recently used shards in memory.
+    """
+
+    def __init__(self, root, shard_size=256, cache_shards=2, transform=None):
+        os.makedirs(root, exist_ok=True)
+        self.cache_shards = cache_shards
+        self._cache = OrderedDict()
+        super().__init__(root, transform)
+
+        #a dataset keeps the shard size it was created with
+        index_path = os.path.join(self.root, INDEX_NAME)
+        if os.path.exists(index_path):
+            with open(index_path) as file:
+                index = json.load(file)
+            self.shard_size, self.shards = index['shard_size'], index['shards']
+        else:
+            self.shard_size, self.shards = shard_size, []
+        self._update_offsets()
+
+    def _update_offsets(self):
+        #id of the first graph of every shard
+        self.offsets = np.cumsum([0] + [shard['num_graphs'] for shard in self.shards])
+
+    def len(self):
+        return int(self.offsets[-1])
+
+    def get(self, idx):
+        shard = int(np.searchsorted(self.offsets, idx, side='right')) - 1
+        return self._load_shard(shard)[idx - self.offsets[shard]]
+
+    def shard_of(self, ids):
+        #shard number of every graph id
+        return np.searchsorted(self.offsets, np.asarray(ids), side='right') - 1
+
+    def _load_shard(self, shard):
+        graphs = self._cache.pop(shard, None)
+        if graphs is None:
+            graphs = torch.load(os.path.join(self.root, self.shards[shard]['file']), weights_only=False)
+        self._cache[shard] = graphs
+        while len(self._cache) > self.cache_shards:
+            self._cache.popitem(last=False)
+        return graphs
+
+    def append(self, graphs):
+        """Write graphs (any iterable, consumed shard_size at a time) to new shards
+        after the existing ones, a partial last shard is not filled by later
+        appends; returns the ids of the appended graphs."""
+        first_id = self.len()
+        graphs = iter(graphs)
+        while True:
+            shard_graphs = list(islice(graphs, self.shard_size))
+            if not shard_graphs:
+                break
+            file_name = f'shard_{len(self.shards):05d}.pt'
+
+            #written under a temporary name first, the index only lists complete shards
+            tmp_path = os.path.join(self.root, f'{file_name}.{os.getpid()}.tmp')
+            torch.save(shard_graphs, tmp_path)
+            os.replace(tmp_path, os.path.join(self.root, file_name))
+
+            self.shards.append({'file': file_name, 'num_graphs': len(shard_graphs)})
+            self._write_index()
+        self._update_offsets()
+        return range(first_id, self.len())
+
+    def _write_index(self):
+        index_path = os.path.join(self.root, INDEX_NAME)
+        with open(index_path + '.tmp', 'w') as file:
+            json.dump({'shard_size': self.shard_size, 'shards': self.shards}, file, indent=1)
+        os.replace(index_path + '.tmp', index_path)
+
+
+class ShardShuffleSampler(Sampler):
+    """Shuffled order of graph ids that reads every shard once per epoch.
+
+    The shards are visited in random order and the ids of a shard are shuffled
+    among themselves, so a shuffled DataLoader over a ShardedGraphDataset does not
+    reload a shard for every batch.
+    """
+
+    def __init__(self, dataset, ids=None, generator=None):
+        self.ids = np.arange(len(dataset)) if ids is None else np.asarray(ids)
+        self.shards = dataset.shard_of(self.ids)
+        self.generator = generator
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        shard_numbers = np.unique(self.shards)
+        for i in torch.randperm(len(shard_numbers), generator=self.generator).tolist():
+            shard_ids = self.ids[self.shards == shard_numbers[i]]
+            yield from shard_ids[torch.randperm(len(shard_ids), generator=self.generator).numpy()].tolist()
@@ -0,0 +1,166 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+def _as_str(values):
+    #URIRef and str only compare equal as plain strings; kept as str objects, a
+    #fixed-width unicode array would hold every URI at the length of the longest
+    return np.fromiter(map(str, values), dtype=object, count=len(values))
+
+
+class NodeIndex:
+    """URI -> (node_type, local_id) table over the node tables of one graph.
+
+    The local id of an entity is its row in the node table of its type. Edge lists
+    are remapped with one vectorized hash lookup per endpoint column instead of a
+    DataFrame.replace per node type.
+    """
+
+    def __init__(self, node_uris):
+        #node_uris: node type -> entity URIs in node table row order
+        self.types = {node_type: pd.Index(_as_str(uris)) for node_type, uris in node_uris.items()}
+
+        node_types = list(self.types)
+        sizes = [len(uris) for uris in self.types.values()]
+        self.table = pd.DataFrame({
+            'uri': np.concatenate([uris.to_numpy() for uris in self.types.values()]) if node_types else np.empty(0, dtype=object),
+            'node_type': pd.Categorical.from_codes(np.repeat(np.arange(len(node_types)), sizes), categories=node_types),
+            'local_id': np.concatenate([np.arange(size, dtype=np.int64) for size in sizes]) if node_types else np.empty(0, dtype=np.int64),
+        })
+
+    def __len__(self):
+        return len(self.table)
+
+    def num_nodes(self, node_type):
+        return len(self.types[node_type])
+
+    def lookup(self, node_type, uris):
+        #local ids of uris in the node table of node_type, -1 for unknown uris
+        if len(uris) == 0:
+            return np.empty(0, dtype=np.int64)
+        return self.types[node_type].get_indexer(_as_str(uris)).astype(np.int64)
+
+    def remap_edges(self, edges, src_type, dst_type):
+        """Map (src_uri, dst_uri) pairs to a (2, num_edges) int64 edge index.
+
+        Edges with an endpoint missing from its node table are dropped. The boolean
+        mask of the kept input rows is returned alongside the edge index, so edge
+        attributes can be filtered the same way.
+        """
+        src, dst = self._lookup_endpoints(edges, src_type, dst_type)
+        mapped = (src >= 0) & (dst >= 0)
+        return np.stack([src[mapped], dst[mapped]]), mapped
+
+    def remap_edge_lists(self, edge_lists, edge_node_types):
+        """remap_edges for every `edge_list_<edge>` of edge_lists, edge_node_types
+        giving the (src_type, dst_type) of every edge name.
+
+        Returns the edge indices keyed like edge_lists and reports the dropped
+        edges of every list.
+        """
+        edge_indices = {}
+        for key, value in edge_lists.items():
+            src_type, dst_type = edge_node_types[key[len('edge_list_'):]]
+            edge_indices[key], mapped = self.remap_edges(value, src_type, dst_type)
+            if not mapped.all():
+                missing_src, missing_dst = self.unmapped_endpoints(value, src_type, dst_type)
+                print(f"## {key}: {(~mapped).sum()} edges dropped, {missing_src} start URIs without a {src_type} node, {missing_dst} end URIs without a {dst_type} node")
+        return edge_indices
+
+    def unmapped_endpoints(self, edges, src_type, dst_type):
+        #number of distinct start / end URIs of edges without a node of src_type / dst_type
+        edges = np.asarray(edges, dtype=object).reshape(-1, 2)
+        src, dst = self._lookup_endpoints(edges, src_type, dst_type)
+        return len(set(_as_str(edges[src < 0, 0]))), len(set(_as_str(edges[dst < 0, 1])))
+
+    def _lookup_endpoints(self, edges, src_type, dst_type):
+        edges = np.asarray(edges, dtype=object).reshape(-1, 2)
+        return self.lookup(src_type, edges[:, 0]), self.lookup(dst_type, edges[:, 1])
+
+
+OUTPUT_FORMATS = ('csv', 'npy')
+MANIFEST_NAME = 'manifest.json'
+
+
+def split_categorical(features):
+    """Split a node feature frame into its dense columns and a CSR matrix of its
+    boolean (one-hot) columns, built from the nonzero rows of each column."""
+    categorical = [col for col in features.columns if pd.api.types.is_bool_dtype(features[col].dtype)]
+    rows = [np.flatnonzero(features[col].to_numpy()) for col in categorical]
+    cols = [np.full(len(row), j) for j, row in enumerate(rows)]
+    matrix = sp.csr_matrix(
+        (np.ones(sum(len(row) for row in rows), dtype=np.float32),
+         (np.concatenate(rows) if rows else np.empty(0, dtype=np.int64), np.concatenate(cols) if cols else np.empty(0, dtype=np.int64))),
+        shape=(len(features), len(categorical)),
+    )
+    return features.drop(columns=categorical), matrix
+
+
+def save_table(table, save_path, name, output_format='csv', dtype=np.float32):
+    """Write one node feature table or (num_edges, 2) edge list under save_path.
+
+    'csv' keeps the headerless CSV tables; 'npy' writes name.npy as dtype (float32
+    features, int64 edges) and records it in the manifest of the folder. Sparse
+    matrices are written as CSR name.npz, 'npy' output only.
+    """
+    if sp.issparse(table):
+        if output_format != 'npy':
+            raise ValueError(f"Sparse tables need the 'npy' output format, got {output_format!r}")
+        matrix = sp.csr_matrix(table, dtype=dtype)
+        sp.save_npz(os.path.join(save_path, name + '.npz'), matrix)
+        update_manifest(save_path, {name: {'file': name + '.npz', 'dtype': str(matrix.dtype), 'shape': list(matrix.shape), 'sparse': 'csr'}})
+    elif output_format == 'csv':
+        pd.DataFrame(table).to_csv(os.path.join(save_path, name + '.csv'), index=False, header=False)
+        update_manifest(save_path, {name: None})
+    elif output_format == 'npy':
+        array = np.ascontiguousarray(np.asarray(table, dtype=dtype))
+        np.save(os.path.join(save_path, name + '.npy'), array)
+        update_manifest(save_path, {name: {'file': name + '.npy', 'dtype': str(array.dtype), 'shape': list(array.shape)}})
+    else:
+        raise ValueError(f"Unknown output format {output_format!r}, expected one of {OUTPUT_FORMATS}")
+
+
+def update_manifest(save_path, tables):
+    #both converters write into the same folder, so entries are merged; None drops
+    #the entry of a table rewritten as CSV
+    manifest_path = os.path.join(save_path, MANIFEST_NAME)
+    manifest = {'format': 'npy', 'tables': {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+    elif all(entry is None for entry in tables.values()):
+        return
+    for name, entry in tables.items():
+        if entry is None:
+            manifest['tables'].pop(name, None)
+        else:
+            manifest['tables'][name] = entry
+    with open(manifest_path, 'w') as file:
+        json.dump(manifest, file, indent=1)
+
+
+def load_table(save_path, name, mmap_mode='r'):
+    """Read a table written by save_table, memory-mapping .npy tables. Sparse
+    tables are returned as scipy CSR matrices.
+
+    Returns None when the folder holds no such table.
+    """
+    manifest_path = os.path.join(save_path, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            entry = json.load(file)['tables'].get(name)
+        if entry is not None and entry.get('sparse'):
+            return sp.load_npz(os.path.join(save_path, entry['file'])).tocsr()
+        if entry is not None:
+            return np.load(os.path.join(save_path, entry['file']), mmap_mode=mmap_mode)
+
+    file_path = os.path.join(save_path, name + '.csv')
+    if not os.path.exists(file_path):
+        return None
+    try:
+        return pd.read_csv(file_path, header=None).to_numpy()
+    except pd.errors.EmptyDataError:
+        return np.empty((0, 2), dtype=np.int64) if name.startswith('edge_list_') else np.empty((0, 0), dtype=np.float32)
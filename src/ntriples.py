@@ -0,0 +1,153 @@
+import bz2
+import glob
+import gzip
+import hashlib
+import os
+import pickle
+import numpy as np
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser
+
+
+DEFAULT_CHUNK_SIZE = 100000
+
+
+def open_ntriples(file_path):
+    #.nt.gz / .nt.bz2 dumps are decompressed on the fly
+    if file_path.endswith('.gz'):
+        return gzip.open(file_path, 'rt', encoding='utf-8')
+    if file_path.endswith('.bz2'):
+        return bz2.open(file_path, 'rt', encoding='utf-8')
+    return open(file_path, 'r', encoding='utf-8')
+
+
+class TermDictionary:
+    """Interns RDF terms to consecutive int ids, every distinct term is kept once."""
+
+    def __init__(self, terms=()):
+        self.terms = []
+        self.ids = {}
+        for term in terms:
+            self.intern(term)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def intern(self, term):
+        term_id = self.ids.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            self.ids[term] = term_id
+            self.terms.append(term)
+        return term_id
+
+    def to_array(self):
+        terms = np.empty(len(self.terms), dtype=object)
+        terms[:] = self.terms
+        return terms
+
+
+class _ChunkedSink:
+    #receives the parsed triples and keeps them as int32 id chunks
+
+    def __init__(self, terms, chunk_size):
+        self.terms = terms
+        self.chunk_size = chunk_size
+        self.buffer = []
+        self.chunks = []
+
+    def triple(self, s, p, o):
+        intern = self.terms.intern
+        self.buffer.append((intern(s), intern(p), intern(o)))
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.chunks.append(np.array(self.buffer, dtype=np.int32))
+            self.buffer = []
+
+
+def read_ntriples(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream an N-Triples file (optionally .gz / .bz2) into int encoded triples.
+
+    Lines are parsed one at a time and the terms interned, so memory grows with the
+    number of distinct terms plus 12 bytes per triple instead of rdflib's per triple
+    objects. Returns the TermDictionary and an (num_triples, 3) int32 array of
+    (s, p, o) ids, duplicates removed like in an rdflib Graph.
+    """
+    terms = TermDictionary()
+    sink = _ChunkedSink(terms, chunk_size)
+    with open_ntriples(file_path) as file:
+        W3CNTriplesParser(sink=sink, bnode_context={}).parse(file)
+    sink.flush()
+
+    if not sink.chunks:
+        return terms, np.empty((0, 3), dtype=np.int32)
+    triples = np.concatenate(sink.chunks)
+    _, first = np.unique(triples, axis=0, return_index=True)
+    return terms, triples[np.sort(first)]
+
+
+class TripleCache:
+    """Sidecar store of int encoded N-Triples dumps, so a file is parsed only once.
+
+    An entry holds the interned terms (pickled) and the (num_triples, 3) int32 id
+    array (.npy, memory-mapped on load). It is keyed by the absolute path of the
+    source and its size and mtime, so a changed file misses the cache and replaces
+    the old entry.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, file_path):
+        stat = os.stat(file_path)
+        path_hash = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+        return path_hash, f"{path_hash}-{stat.st_size}-{stat.st_mtime_ns}"
+
+    def load(self, file_path):
+        _, key = self._key(file_path)
+        terms_path = os.path.join(self.cache_dir, key + '.terms.pkl')
+        triples_path = os.path.join(self.cache_dir, key + '.triples.npy')
+        if not (os.path.exists(terms_path) and os.path.exists(triples_path)):
+            return None
+        with open(terms_path, 'rb') as file:
+            terms = pickle.load(file)
+        return terms, np.load(triples_path, mmap_mode='r')
+
+    def store(self, file_path, terms, triple_ids):
+        path_hash, key = self._key(file_path)
+        for stale in glob.glob(os.path.join(self.cache_dir, path_hash + '-*')):
+            if not os.path.basename(stale).startswith(key + '.'):
+                os.remove(stale)
+
+        #written under a temporary name first, readers never see half written files
+        tmp_suffix = f'.{os.getpid()}.tmp'
+        triples_path = os.path.join(self.cache_dir, key + '.triples.npy')
+        with open(triples_path + tmp_suffix, 'wb') as file:
+            np.save(file, np.ascontiguousarray(triple_ids, dtype=np.int32))
+        os.replace(triples_path + tmp_suffix, triples_path)
+
+        terms_path = os.path.join(self.cache_dir, key + '.terms.pkl')
+        with open(terms_path + tmp_suffix, 'wb') as file:
+            pickle.dump(terms, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(terms_path + tmp_suffix, terms_path)
+
+
+def load_ntriples(file_path, cache_dir=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """read_ntriples through a TripleCache in cache_dir (no cache if None).
+
+    Returns an object array of terms and the (num_triples, 3) int32 id array.
+    """
+    cache = TripleCache(cache_dir) if cache_dir else None
+    if cache is not None:
+        cached = cache.load(file_path)
+        if cached is not None:
+            return cached
+
+    terms, triple_ids = read_ntriples(file_path, chunk_size)
+    terms = terms.to_array()
+    if cache is not None:
+        cache.store(file_path, terms, triple_ids)
+    return terms, triple_ids
@@ -0,0 +1,190 @@
+import hashlib
+import os
+import sqlite3
+import time
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModel
+from tqdm import tqdm
+
+
+class TextEmbedder:
+    """Mean-pooled transformer embeddings (SciBERT by default) for NLD strings.
+
+    The model is loaded once and strings are embedded in batches sorted by token
+    length, padded only to the longest string of each batch. Duplicate strings are
+    embedded once, and with a cache only strings never seen before reach the model.
+    """
+
+    def __init__(self, embedding_model, batch_size=32, max_length=512, cache=None):
+        self.embedding_model = embedding_model
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.cache = cache
+        self.tokenizer, self.model = _load_model(embedding_model)
+
+    def embed(self, texts, output_size=128, desc="Embedding Progress"):
+        texts = list(texts)
+        result = np.zeros((len(texts), output_size), dtype=np.float32)
+        if not texts:
+            return result
+
+        #identical strings (shared media, chassis, ...) are embedded once
+        unique_texts = list(dict.fromkeys(texts))
+        vectors = {}
+        if self.cache is not None:
+            vectors = self.cache.get_many(self.embedding_model, unique_texts, output_size)
+
+        missing = [text for text in unique_texts if text not in vectors]
+        if missing:
+            computed = self._forward(missing, output_size, desc)
+            vectors.update(zip(missing, computed))
+            if self.cache is not None:
+                self.cache.put_many(self.embedding_model, missing, computed, output_size)
+
+        for i, text in enumerate(texts):
+            result[i] = vectors[text]
+        return result
+
+    def _forward(self, texts, output_size, desc):
+        result = np.zeros((len(texts), output_size), dtype=np.float32)
+
+        encodings = self.tokenizer(texts, max_length=self.max_length, truncation=True)
+        columns = list(encodings.keys())
+        lengths = [len(ids) for ids in encodings['input_ids']]
+        order = np.argsort(lengths, kind='stable')
+
+        batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+        with torch.inference_mode():
+            for batch in tqdm(batches, desc=desc):
+                features = [{column: encodings[column][i] for column in columns} for i in batch]
+                tokens = self.tokenizer.pad(features, return_tensors='pt')
+                outputs = self.model(**tokens)
+
+                #mean over the real tokens only, padding differs from batch to batch
+                mask = tokens['attention_mask'].unsqueeze(-1).to(outputs.last_hidden_state.dtype)
+                summed = (outputs.last_hidden_state * mask).sum(dim=1)
+                reduced_embeddings = (summed / mask.sum(dim=1).clamp(min=1))[:, :output_size]
+                result[batch] = reduced_embeddings.numpy()
+
+        return result
+
+
+class EmbeddingCache:
+    """Content-addressed SQLite store of text embeddings, shared between processes.
+
+    Entries are keyed by (embedding_model, sha256 of the text, output_size). When
+    more than max_entries are stored the least recently used ones are evicted.
+    """
+
+    _chunk_size = 500
+
+    def __init__(self, path, max_entries=100000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA mmap_size=268435456")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self.connection.commit()
+
+    @staticmethod
+    def make_key(embedding_model, text, output_size):
+        text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{embedding_model}|{output_size}|{text_hash}"
+
+    def get_many(self, embedding_model, texts, output_size):
+        keys = {self.make_key(embedding_model, text, output_size): text for text in texts}
+        found = {}
+        key_list = list(keys)
+        for i in range(0, len(key_list), self._chunk_size):
+            chunk = key_list[i:i + self._chunk_size]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.connection.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk).fetchall()
+            for key, vector in rows:
+                found[keys[key]] = np.frombuffer(vector, dtype=np.float32)
+            if rows:
+                hit_keys = [key for key, _ in rows]
+                self.connection.execute(f"UPDATE embeddings SET last_used = ? WHERE key IN ({','.join('?' * len(hit_keys))})", [time.time()] + hit_keys)
+        self.connection.commit()
+
+        self.hits += len(found)
+        self.misses += len(texts) - len(found)
+        return found
+
+    def put_many(self, embedding_model, texts, vectors, output_size):
+        now = time.time()
+        rows = [(self.make_key(embedding_model, text, output_size), np.asarray(vector, dtype=np.float32).tobytes(), now) for text, vector in zip(texts, vectors)]
+        self.connection.executemany("INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows)
+        self.evict()
+        self.connection.commit()
+
+    def evict(self):
+        count = self.connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if count > self.max_entries:
+            self.connection.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self)}
+
+
+_models = {}
+_embedders = {}
+_caches = {}
+_num_threads = None
+
+def _load_model(embedding_model):
+    #tokenizer and weights are loaded once per process, embedders with other settings share them
+    if embedding_model not in _models:
+        model = AutoModel.from_pretrained(embedding_model)
+        model.eval()
+        _models[embedding_model] = (AutoTokenizer.from_pretrained(embedding_model), model)
+    return _models[embedding_model]
+
+def get_embedder(embedding_model, batch_size=32, num_threads=None, cache_path=None, cache_max_entries=100000):
+    """Return the process-wide embedder for embedding_model and these settings,
+    loading it on first use.
+
+    Embedders with other settings are separate instances sharing the model, so
+    no caller sees its settings changed. The torch thread count and the size of a
+    cache file are process-wide, conflicting values raise a ValueError.
+    """
+    global _num_threads
+    if num_threads:
+        if _num_threads is not None and _num_threads != num_threads:
+            raise ValueError(f"Embedding num_threads = {num_threads} conflicts with {_num_threads} set earlier in this process")
+        _num_threads = num_threads
+        torch.set_num_threads(num_threads)
+
+    cache = None
+    if cache_path:
+        cache = _caches.get(cache_path)
+        if cache is None:
+            cache = EmbeddingCache(cache_path, max_entries=cache_max_entries)
+            _caches[cache_path] = cache
+        elif cache.max_entries != cache_max_entries:
+            raise ValueError(f"Embedding cache {cache_path} already opened with cache_max_entries = {cache.max_entries}, got {cache_max_entries}")
+
+    key = (embedding_model, batch_size, cache_path)
+    embedder = _embedders.get(key)
+    if embedder is None:
+        embedder = TextEmbedder(embedding_model, batch_size=batch_size, cache=cache)
+        _embedders[key] = embedder
+    return embedder
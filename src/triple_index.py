@@ -0,0 +1,232 @@
+import itertools
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from rdflib import RDF, Graph, Literal, URIRef
+from ntriples import DEFAULT_CHUNK_SIZE, TermDictionary, load_ntriples
+
+
+class TripleIndex:
+    """Lookup tables over the triples of one RDF graph, built in a single pass.
+
+    The converters used to send one SPARQL query per class / predicate / hop
+    combination, each of them scanning the whole store again. The triples are
+    only kept as int ids into one array of terms, with their rows ordered by
+    subject and by predicate. The index keeps subject -> rdf:type from the type
+    triples, and the subject -> objects adjacency of a predicate is built from
+    its rows when first asked for, so node tables and edge lists become
+    dictionary lookups. N-hop edges are sparse adjacency matrix products, see
+    `hop_edges`.
+
+    Build it from any iterable of rdflib triples (e.g. a Graph), or stream an
+    N-Triples file with `from_ntriples` without building a Graph at all.
+    """
+
+    def __init__(self, triples):
+        #the triples themselves are only kept int encoded, grouped by subject
+        terms = TermDictionary()
+        triple_ids = np.fromiter((terms.intern(term) for triple in triples for term in triple), dtype=np.int64).reshape(-1, 3)
+        self._build(terms.to_array(), triple_ids)
+
+    def _build(self, terms, triple_ids):
+        self.num_triples = len(triple_ids)
+        self.terms = terms
+
+        #int encoded nodes and per predicate / per property path adjacency, built on first use
+        self._nodes = None
+        self._node_ids = None
+        self._adjacency = {}
+        self._path_matrices = {}
+
+        #(num_triples, 3) int64 ids into the object array terms, grouped by subject in
+        #order of first appearance; subject_rows gives the row range of every subject
+        ids = np.asarray(triple_ids, dtype=np.int64)
+        subjects, first = np.unique(ids[:, 0], return_index=True)
+        rank = np.empty(len(terms), dtype=np.int64)
+        rank[subjects[np.argsort(first)]] = np.arange(len(subjects))
+        order = np.argsort(rank[ids[:, 0]], kind='stable')
+        self.triple_ids = ids[order]
+        bounds = np.flatnonzero(np.diff(self.triple_ids[:, 0])) + 1
+        starts = np.concatenate([[0], bounds]) if len(ids) else np.empty(0, dtype=np.int64)
+        stops = np.concatenate([bounds, [len(ids)]]) if len(ids) else np.empty(0, dtype=np.int64)
+        self.subject_rows = dict(zip(terms[self.triple_ids[starts, 0]], zip(starts.tolist(), stops.tolist())))
+
+        #rows of triple_ids ordered by predicate, in source order within a predicate;
+        #predicate_rows gives the range of every predicate in that order
+        grouped_rows = np.empty(len(ids), dtype=np.int64)
+        grouped_rows[order] = np.arange(len(ids))
+        by_predicate = np.argsort(ids[:, 1], kind='stable')
+        self._predicate_order = grouped_rows[by_predicate]
+        predicates, starts, counts = np.unique(ids[by_predicate, 1], return_index=True, return_counts=True)
+        self.predicate_rows = dict(zip(terms[predicates], zip(starts.tolist(), (starts + counts).tolist())))
+
+        #subject -> set of rdf:type objects and class -> subjects (dict used as an ordered
+        #set), from the type triples alone
+        self.types = {}
+        self.instances = {}
+        for s, o in zip(*self._predicate_pairs(RDF.type)):
+            self.types.setdefault(s, set()).add(o)
+            self.instances.setdefault(o, {})[s] = None
+
+    def _predicate_pairs(self, predicate):
+        #(subjects, objects) term arrays of the triples of one predicate, in source order
+        start, stop = self.predicate_rows.get(URIRef(predicate), (0, 0))
+        rows = self.triple_ids[self._predicate_order[start:stop]]
+        return self.terms[rows[:, 0]], self.terms[rows[:, 2]]
+
+    def _objects_by_subject(self, predicate):
+        #subject -> [object] adjacency of one predicate, built on first use
+        predicate = URIRef(predicate)
+        adjacency = self._adjacency.get(predicate)
+        if adjacency is None:
+            adjacency = {}
+            for s, o in zip(*self._predicate_pairs(predicate)):
+                adjacency.setdefault(s, []).append(o)
+            self._adjacency[predicate] = adjacency
+        return adjacency
+
+    @classmethod
+    def from_ids(cls, terms, triple_ids):
+        #terms: object array of rdflib terms, triple_ids: (num_triples, 3) ids into terms
+        index = cls.__new__(cls)
+        index._build(terms, triple_ids)
+        return index
+
+    @classmethod
+    def from_ntriples(cls, file_path, cache_dir=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        #with a cache_dir the parsed ids are reused until the file changes
+        terms, triple_ids = load_ntriples(file_path, cache_dir, chunk_size)
+        return cls.from_ids(terms, triple_ids)
+
+    def __len__(self):
+        return self.num_triples
+
+    def _decode(self, rows):
+        return zip(self.terms[rows[:, 0]], self.terms[rows[:, 1]], self.terms[rows[:, 2]])
+
+    def triples(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        for start in range(0, self.num_triples, chunk_size):
+            yield from self._decode(self.triple_ids[start:start + chunk_size])
+
+    def encoded_triples(self):
+        """(terms, ids) with the (num_triples, 3) int64 ids into the object array
+        terms, rows in the order of `triples()`."""
+        return self.terms, self.triple_ids
+
+    def entities(self, class_uri):
+        return list(self.instances.get(URIRef(class_uri), ()))
+
+    def sorted_entities(self, class_uris):
+        #distinct entities of any of class_uris in the sorted subject order of the
+        #pivoted content-based node tables, so both converters number nodes alike
+        return sorted({entity for class_uri in class_uris for entity in self.instances.get(URIRef(class_uri), ())})
+
+    def has_type(self, node, class_uri):
+        return URIRef(class_uri) in self.types.get(node, ())
+
+    def objects(self, subject, predicate):
+        return self._objects_by_subject(predicate).get(subject, [])
+
+    def class_triples(self, class_uri):
+        #all (s, p, o) with s of type class_uri, distinct
+        rows = {}
+        for s in self.instances.get(URIRef(class_uri), ()):
+            if s in self.subject_rows:
+                start, stop = self.subject_rows[s]
+                rows.update(dict.fromkeys(self._decode(self.triple_ids[start:stop])))
+        return list(rows)
+
+    def edges(self, class_a, predicate, class_b):
+        #distinct (a, c) with a of type class_a, c of type class_b and a predicate c
+        class_a, class_b = URIRef(class_a), URIRef(class_b)
+        pairs = {}
+        for s, objects in self._objects_by_subject(predicate).items():
+            if class_a not in self.types.get(s, ()):
+                continue
+            for o in objects:
+                if class_b in self.types.get(o, ()):
+                    pairs[(s, o)] = None
+        return list(pairs)
+
+    def class_edges(self, start_classes, predicates, end_classes):
+        #edges(a, p, b) of every start class, predicate and end class combination, concatenated
+        return [pair for a in start_classes for b in end_classes for p in predicates for pair in self.edges(a, p, b)]
+
+    def _encode_nodes(self):
+        if self._node_ids is None:
+            node_ids = {}
+            for s, _, o in self.triples():
+                node_ids.setdefault(s, len(node_ids))
+                if not isinstance(o, Literal):
+                    node_ids.setdefault(o, len(node_ids))
+            self._node_ids = node_ids
+            self._nodes = np.empty(len(node_ids), dtype=object)
+            self._nodes[:] = list(node_ids)
+        return self._node_ids
+
+    def _class_ids(self, class_uri):
+        node_ids = self._encode_nodes()
+        return np.fromiter((node_ids[s] for s in self.instances.get(URIRef(class_uri), ())), dtype=np.int64)
+
+    def path_matrix(self, predicates):
+        """Boolean (num_nodes, num_nodes) CSR matrix of the property path predicates[0] / predicates[1] / ...
+
+        Products are cached per path prefix, so edge definitions sharing their
+        first hops (or calling with the same path again) reuse them.
+        """
+        predicates = tuple(URIRef(p) for p in predicates)
+        matrix = self._path_matrices.get(predicates)
+        if matrix is not None:
+            return matrix
+
+        node_ids = self._encode_nodes()
+        if len(predicates) == 1:
+            rows, cols = [], []
+            for s, objects in self._objects_by_subject(predicates[0]).items():
+                for o in objects:
+                    if o in node_ids:
+                        rows.append(node_ids[s])
+                        cols.append(node_ids[o])
+            matrix = sp.csr_matrix((np.ones(len(rows), dtype=bool), (rows, cols)), shape=(len(node_ids), len(node_ids)))
+        else:
+            matrix = (self.path_matrix(predicates[:-1]) @ self.path_matrix(predicates[-1:])).astype(bool)
+        self._path_matrices[predicates] = matrix
+        return matrix
+
+    def hop_edges(self, class_a_list, hops, class_x_list):
+        """Distinct (a, x) with a of a class in class_a_list, x of a class in class_x_list
+        and x reachable from a by one predicate of every hop in hops.
+        """
+        node_ids = self._encode_nodes()
+        reach = sp.csr_matrix((len(node_ids), len(node_ids)), dtype=bool)
+        for predicates in itertools.product(*hops):
+            reach = reach + self.path_matrix(predicates)
+
+        pairs = {}
+        for class_a in class_a_list:
+            rows = self._class_ids(class_a)
+            for class_x in class_x_list:
+                cols = self._class_ids(class_x)
+                found = reach[rows][:, cols].tocoo()
+                pairs.update(dict.fromkeys(zip(self._nodes[rows[found.row]], self._nodes[cols[found.col]])))
+        return list(pairs)
+
+    def predicate_frame(self, predicate, columns=('subject', 'object')):
+        #all (s, o) of one predicate as a two column frame, for bulk joins
+        rows = [(s, o) for s, objects in self._objects_by_subject(predicate).items() for o in objects]
+        return pd.DataFrame(rows, columns=list(columns))
+
+
+def load_triple_index(graph_or_path, cache_dir=None):
+    """TripleIndex of a TripleIndex (returned as is), an rdflib Graph or an
+    N-Triples file, the file streamed without building a Graph."""
+    if isinstance(graph_or_path, TripleIndex):
+        return graph_or_path
+    if isinstance(graph_or_path, Graph):
+        return TripleIndex(graph_or_path)
+
+    file_path = graph_or_path
+    print(f"## Loading the RDF dump from: {file_path=}...")
+    index = TripleIndex.from_ntriples(file_path, cache_dir=cache_dir)
+    print(f"## RDF dump file loaded. The RDF graph contains {len(index)} triples.")
+    return index
@@ -0,0 +1,96 @@
+import configparser
+import os
+import sys
+
+import numpy as np
+from rdflib import RDF, Graph, Literal, URIRef
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from autordf2gml import ContentConverter
+from autordf2gml_tb import TopologyConverter
+from conversion_plan import compile_plan
+
+
+EX = 'http://example.org/'
+
+CONFIG = f'''
+[NLD]
+nld_class = Module
+
+[EMBEDDING]
+embedding_model = unused
+
+[Nodes]
+classes = Module, Part
+Module = {EX}Module
+Part = {EX}Part
+
+[SimpleEdges]
+edge_names = Module_Part, Module_Module
+Module_Part_start_node = Module
+Module_Part_properties = {EX}uses
+Module_Part_end_node = Part
+Module_Module_start_node = Module
+Module_Module_properties = {EX}contains
+Module_Module_end_node = Module
+
+[MODEL]
+kge_model = distmult
+
+[EmbeddingClasses]
+class_list = {EX}Module, {EX}Part
+
+[EmbeddingPredicates]
+pred_list = {EX}uses, {EX}contains
+'''
+
+
+class _ConstantEmbedder:
+    cache = None
+
+    def embed(self, texts, output_size=128):
+        return [np.ones(output_size) for _ in texts]
+
+
+def _design():
+    #entities are added out of URI order, so first appearance and sorted order differ
+    graph = Graph()
+    modules = [URIRef(f'{EX}module_{name}') for name in 'dbca']
+    parts = [URIRef(f'{EX}part_{name}') for name in 'zyx']
+    for i, module in enumerate(modules):
+        graph.add((module, RDF.type, URIRef(EX + 'Module')))
+        graph.add((module, URIRef(EX + 'length'), Literal(10 * i)))
+    for i, part in enumerate(parts):
+        graph.add((part, RDF.type, URIRef(EX + 'Part')))
+        graph.add((part, URIRef(EX + 'length'), Literal(i)))
+    for module, part in zip(modules, parts):
+        graph.add((module, URIRef(EX + 'uses'), part))
+    graph.add((modules[0], URIRef(EX + 'contains'), modules[3]))
+    graph.add((modules[2], URIRef(EX + 'contains'), modules[1]))
+    return graph
+
+
+def test_content_and_topology_converters_share_node_ids():
+    config = configparser.ConfigParser()
+    config.read_string(CONFIG)
+    plan = compile_plan(config, content=True, topology=True)
+    content, topology = ContentConverter(plan), TopologyConverter(plan)
+    content._embedder = _ConstantEmbedder()
+
+    index = content.load_index(_design())
+    content_tables = content.convert(index)
+    #the node and edge tables do not depend on the embedding values, no KGE training needed
+    entities = sorted({s for s, _, _ in index.triples()})
+    entity_dict = {entity: row for row, entity in enumerate(entities)}
+    topology_tables = topology._build_tables(index, entity_dict, np.zeros((len(entities), 2), dtype=np.float32))
+
+    for class_name in plan.class_names:
+        content_subjects = list(content_tables['nodes'][f'pivoted_df_{class_name}']['subject'])
+        topology_subjects = list(topology_tables['nodes'][f'pivoted_df_uri_list_{class_name}']['subject'])
+        assert content_subjects == topology_subjects == sorted(content_subjects)
+
+    assert content_tables['edges'].keys() == topology_tables['edges'].keys()
+    for key, edge_index in content_tables['edges'].items():
+        assert edge_index.shape[1] > 0
+        np.testing.assert_array_equal(edge_index, topology_tables['edges'][key])